@@ -0,0 +1,143 @@
+import pygame
+import os
+import json
+import mmap
+import struct
+import hashlib
+
+CACHE_MAGIC = b'KDAC'
+CACHE_VERSION = 1
+HEADER = struct.Struct('<4sII')  # magic, version, index length
+
+class AssetCache:
+    """On-disk cache of decoded, pre-scaled image pixels, memory-mapped on load
+
+    The file is a small header, a JSON index mapping
+    "filename|WxH|source sha1" to [offset, width, height], then raw RGBA pixels.
+    Entries are looked up by source hash, so editing an image invalidates it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        self.data_start = 0
+        self.file = None
+        self.buffer = None
+        self.pending = {}
+        self.used = set()
+        self.open()
+
+    def open(self):
+        """Map the cache file if it exists and is valid"""
+        try:
+            self.file = open(self.path, 'rb')
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_length = HEADER.unpack_from(self.buffer, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                raise ValueError("stale asset cache format")
+            index_end = HEADER.size + index_length
+            self.index = json.loads(bytes(self.buffer[HEADER.size:index_end]))
+            self.data_start = index_end
+        except (OSError, ValueError, struct.error):
+            # Missing, empty or corrupt cache: start fresh
+            self.index = {}
+            self.close()
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    @staticmethod
+    def source_hash(filepath):
+        """SHA-1 of a source asset file"""
+        digest = hashlib.sha1()
+        with open(filepath, 'rb') as source:
+            for chunk in iter(lambda: source.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(filename, size, digest):
+        size_key = f"{size[0]}x{size[1]}" if size else "native"
+        return f"{filename}|{size_key}|{digest}"
+
+    def load(self, key):
+        """Build a surface straight from cached pixels, or return None on a miss"""
+        entry = self.index.get(key)
+        if entry is None or self.buffer is None:
+            return None
+        offset, width, height = entry
+        start = self.data_start + offset
+        view = memoryview(self.buffer)[start:start + width * height * 4]
+        try:
+            # Zero-copy view of the mapped pixels, converted once into an owned surface
+            mapped = pygame.image.frombuffer(view, (width, height), 'RGBA')
+            try:
+                surface = mapped.convert_alpha()
+            except pygame.error:
+                surface = mapped.copy()
+            del mapped
+        finally:
+            view.release()
+        self.used.add(key)
+        return surface
+
+    def store(self, key, surface):
+        """Queue a decoded, scaled surface to be written on the next save
+
+        Never raises: a surface that can't be cached is simply decoded again next launch,
+        so the image that was just loaded is never lost to a cache failure.
+        """
+        try:
+            # tostring rather than tobytes, which needs pygame 2.1.3
+            self.pending[key] = (surface.get_size(), pygame.image.tostring(surface, 'RGBA'))
+        except (pygame.error, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """Rewrite the cache file if anything new was decoded this run"""
+        if not self.pending:
+            return
+
+        # Keep the entries that were still valid this run, plus the new ones
+        blobs = {}
+        for key in self.used:
+            offset, width, height = self.index[key]
+            start = self.data_start + offset
+            blobs[key] = ((width, height), bytes(self.buffer[start:start + width * height * 4]))
+        blobs.update(self.pending)
+
+        index = {}
+        offset = 0
+        for key, ((width, height), pixels) in blobs.items():
+            index[key] = [offset, width, height]
+            offset += len(pixels)
+        index_bytes = json.dumps(index).encode('utf-8')
+
+        self.close()
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as out:
+                out.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(index_bytes)))
+                out.write(index_bytes)
+                for _, pixels in blobs.values():
+                    out.write(pixels)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Read-only install: run without a cache
+            pass
+        self.pending.clear()
+        self.used.clear()
+        self.open()
+
+if __name__ == "__main__":
+    # Build step: decode and scale every image once so the next launch skips it
+    from assets import assets
+    pygame.init()
+    assets.set_sound_enabled(False)
+    assets.load_all_assets()
+    print(f"Asset cache written to {assets.cache.path}")
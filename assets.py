@@ -1,19 +1,119 @@
 import pygame
 import os
+import gc
+import time
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
 from constants import *
+from asset_cache import AssetCache
+from voices import voices
+from entity_types import ENEMY_TYPES, TOWER_TYPES
+
+# (name, filename, size, fallback_color, fallback_size) in loading priority order.
+# background.png is not listed: the game draws a generated grid instead.
+IMAGE_MANIFEST = [
+    # Tower sprites - single image per type, level shown via UI
+    ('archer_tower', 'archer_tower.png', (64, 64), BROWN, (32, 32)),
+    ('magic_tower', 'magic_tower.png', (64, 64), PURPLE, (32, 32)),
+    ('cannon_tower', 'cannon_tower.png', (64, 64), GRAY, (32, 32)),
+    
+    # Enemy sprites - using single images (no separate walk animations)
+    ('goblin', 'goblin.png', (32, 32), GREEN, (32, 32)),
+    ('orc', 'orc.png', (32, 32), DARK_GREEN, (32, 32)),
+    ('troll', 'troll.png', (40, 40), BROWN, (32, 32)),
+    ('dragon', 'dragon.png', (50, 50), RED, (32, 32)),
+    
+    # Castle
+    ('castle', 'castle.png', (130, 130), GRAY, (32, 32)),
+    
+    # Projectiles
+    ('arrow', 'arrow.png', (16, 16), YELLOW, (8, 8)),
+    ('magic_bolt', 'magic_bolt.png', (16, 16), PURPLE, (8, 8)),
+    ('cannonball', 'cannonball.png', (16, 16), BLACK, (8, 8)),
+    
+    # UI Elements
+    ('button_normal', 'button_normal.png', (100, 30), GRAY, (32, 32)),
+    ('button_hover', 'button_hover.png', (100, 30), BLUE, (32, 32)),
+    ('button_pressed', 'button_pressed.png', (100, 30), DARK_GREEN, (32, 32)),
+    ('coin_icon', 'coin_icon.png', (24, 24), YELLOW, (20, 20)),
+    ('coin_pickup', 'coin_pickup.png', (32, 32), YELLOW, (24, 24)),
+    ('heart_icon', 'heart_icon.png', (24, 24), RED, (20, 20)),
+    ('wave_icon', 'wave_icon.png', (24, 24), BLUE, (20, 20)),
+    
+    # Effects
+    ('explosion_1', 'explosion_1.png', (32, 32), ORANGE, (20, 20)),
+    ('explosion_2', 'explosion_2.png', (32, 32), RED, (20, 20)),
+    ('explosion_3', 'explosion_3.png', (32, 32), YELLOW, (20, 20)),
+    ('explosion_4', 'explosion_4.png', (32, 32), WHITE, (20, 20)),
+    
+    # Path segments
+    ('path_straight', 'path_straight.png', (40, 40), BROWN, (20, 20)),
+    ('path_curve', 'path_curve.png', (40, 40), BROWN, (20, 20)),
+]
+
+# Animated GIFs decoded into frame sequences: (name, filename, frame size)
+ANIMATION_MANIFEST = [
+    ('portal', 'portal.gif', (80, 80)),  # Enemy spawn point
+    ('explode', 'explode.gif', (64, 64)),  # Cannonball impact
+]
+
+# (name, filename, volume)
+SOUND_MANIFEST = [
+    ('coin_pickup', 'coin_pickup.mp3', 0.4),
+    ('coin_pickup_alt', 'coin_pickup.wav', 0.4),  # Alternative format
+    ('enemy_death', 'enemy_death.mp3', 0.7),
+    ('tower_shoot', 'tower_shoot.mp3', 0.3),
+]
 
 class AssetManager:
+    CACHE_FILENAME = 'asset_cache.bin'
+    
     def __init__(self):
         self.images = {}
         self.sounds = {}
+        self.animations = {}  # name -> tuple of frames sharing one sprite sheet
+        self.cache = None  # Decoded image cache, opened when assets are first loaded
+        
+        # LRU cache of rotated/faded/tinted variants of loaded images
+        self.derived = OrderedDict()
+        self.derived_bytes = 0
+        self.derived_max_bytes = DERIVED_CACHE_MAX_BYTES
+        self.derived_hits = 0
+        self.derived_misses = 0
         self.base_path = os.path.dirname(__file__)
         self.assets_loaded = False
         
-        # Initialize pygame mixer for sound
+        # Background loading state
+        self.loading_started = False
+        self.heap_frozen = False
+        self.loading = False
+        self.executor = None
+        self.completed = queue.SimpleQueue()
+        self.loads_total = 0
+        self.loads_pending = 0
+        self.revision = 0  # Bumped whenever a loaded asset replaces its placeholder
+        self.sound_enabled = True
+        self.mixer_initialized = False
+    
+    def init_mixer(self):
+        """Initialize pygame mixer for sound (deferred so headless runs never touch audio)"""
+        if self.mixer_initialized or not self.sound_enabled:
+            return
         try:
             pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
         except pygame.error:
             print("Warning: Could not initialize audio mixer")
+        self.mixer_initialized = True
+    
+    def set_sound_enabled(self, enabled):
+        """Enable or disable all sound playback and loading"""
+        self.sound_enabled = enabled
     
     def load_image(self, filename, size=None, fallback_color=None, fallback_size=(32, 32)):
         """Load image with fallback to colored rectangle if image not found"""
@@ -21,6 +121,14 @@ class AssetManager:
         
         try:
             if os.path.exists(filepath):
+                # Pre-scaled pixels from the on-disk cache skip decoding and scaling
+                key = None
+                if self.cache is not None:
+                    key = self.cache.make_key(filename, size, self.cache.source_hash(filepath))
+                    image = self.cache.load(key)
+                    if image is not None:
+                        return image
+                        
                 image = pygame.image.load(filepath)
                 # Try convert_alpha first, fallback to convert if display not initialized
                 try:
@@ -32,20 +140,73 @@ class AssetManager:
                         pass  # Use original image if convert fails
                 if size:
                     image = pygame.transform.scale(image, size)
+                if key is not None:
+                    self.cache.store(key, image)
                 return image
             else:
                 # Create fallback colored surface
-                surface = pygame.Surface(fallback_size, pygame.SRCALPHA)
-                if fallback_color:
-                    surface.fill(fallback_color)
-                return surface
+                return self.make_fallback(fallback_color, fallback_size)
         except Exception as e:
             pass  # Silently fall back to colored surface
             # Create fallback colored surface on any error
-            surface = pygame.Surface(fallback_size, pygame.SRCALPHA)
-            if fallback_color:
-                surface.fill(fallback_color)
-            return surface
+            return self.make_fallback(fallback_color, fallback_size)
+            
+    def make_fallback(self, fallback_color, fallback_size):
+        """Colored rectangle standing in for a missing or not yet loaded image"""
+        surface = pygame.Surface(fallback_size, pygame.SRCALPHA)
+        if fallback_color:
+            surface.fill(fallback_color)
+        return surface
+    
+    def load_animation(self, filename, size):
+        """Load every frame of an animated GIF, or an empty tuple if it is unavailable
+        
+        Frames are decoded once into a horizontal sprite sheet (which is what the
+        on-disk cache stores) and returned as subsurfaces of that sheet.
+        """
+        filepath = os.path.join(self.base_path, filename)
+        if not os.path.exists(filepath):
+            return ()
+            
+        try:
+            key = None
+            sheet = None
+            if self.cache is not None:
+                key = self.cache.make_key(filename + '#sheet', size, self.cache.source_hash(filepath))
+                sheet = self.cache.load(key)
+            if sheet is None:
+                sheet = self.decode_sheet(filepath, size)
+                if key is not None:
+                    self.cache.store(key, sheet)
+                    
+            width, height = size
+            return tuple(sheet.subsurface((i * width, 0, width, height))
+                         for i in range(sheet.get_width() // width))
+        except Exception as e:
+            return ()  # Callers draw their own fallback animation
+            
+    def decode_sheet(self, filepath, size):
+        """Decode and scale all frames of a GIF side by side into one surface"""
+        width, height = size
+        if PIL_AVAILABLE:
+            with Image.open(filepath) as gif:
+                frame_count = getattr(gif, 'n_frames', 1)
+                strip = Image.new('RGBA', (width * frame_count, height))
+                for frame_num in range(frame_count):
+                    gif.seek(frame_num)
+                    # Convert to RGBA to handle transparency properly
+                    frame = gif.convert('RGBA').resize(size, Image.Resampling.LANCZOS)
+                    strip.paste(frame, (frame_num * width, 0))
+                sheet = pygame.image.fromstring(strip.tobytes(), strip.size, 'RGBA')
+        else:
+            # pygame alone only decodes the first frame
+            sheet = pygame.transform.scale(pygame.image.load(filepath), size)
+            
+        try:
+            sheet = sheet.convert_alpha()
+        except pygame.error:
+            pass
+        return sheet
     
     def load_sound(self, filename, fallback_volume=0.3):
         """Load sound with fallback to silent sound if file not found"""
@@ -63,104 +224,250 @@ class AssetManager:
 
             return None
     
-    def load_all_assets(self):
-        """Load all game assets"""
-        
-        # Background
-        self.images['background'] = self.load_image('background.png', 
-                                                   (SCREEN_WIDTH, SCREEN_HEIGHT), 
-                                                   DARK_GREEN)
-        
-        # Castle
-        self.images['castle'] = self.load_image('castle.png', (130, 130), GRAY)
-        
-        # Enemy sprites - using single images (no separate walk animations)
-        enemy_size = (32, 32)
-        self.images['goblin'] = self.load_image('goblin.png', enemy_size, GREEN)
-        self.images['orc'] = self.load_image('orc.png', enemy_size, DARK_GREEN)
-        self.images['troll'] = self.load_image('troll.png', (40, 40), BROWN)
-        self.images['dragon'] = self.load_image('dragon.png', (50, 50), RED)
-        
-        # Tower sprites - single image per type, level shown via UI
-        tower_size = (64, 64)
-        self.images['archer_tower'] = self.load_image('archer_tower.png', tower_size, BROWN)
-        self.images['magic_tower'] = self.load_image('magic_tower.png', tower_size, PURPLE)
-        self.images['cannon_tower'] = self.load_image('cannon_tower.png', tower_size, GRAY)
-        
-        # Projectiles
-        self.images['arrow'] = self.load_image('arrow.png', (16, 16), YELLOW, (8, 8))
-        self.images['magic_bolt'] = self.load_image('magic_bolt.png', (16, 16), PURPLE, (8, 8))
-        self.images['cannonball'] = self.load_image('cannonball.png', (16, 16), BLACK, (8, 8))
-        
-        # UI Elements
-        self.images['button_normal'] = self.load_image('button_normal.png', (100, 30), GRAY)
-        self.images['button_hover'] = self.load_image('button_hover.png', (100, 30), BLUE)
-        self.images['button_pressed'] = self.load_image('button_pressed.png', (100, 30), DARK_GREEN)
-        
-        self.images['coin_icon'] = self.load_image('coin_icon.png', (24, 24), YELLOW, (20, 20))
-        self.images['coin_pickup'] = self.load_image('coin_pickup.png', (32, 32), YELLOW, (24, 24))
-        self.images['heart_icon'] = self.load_image('heart_icon.png', (24, 24), RED, (20, 20))
-        self.images['wave_icon'] = self.load_image('wave_icon.png', (24, 24), BLUE, (20, 20))
-        
-        # Effects
-        self.images['explosion_1'] = self.load_image('explosion_1.png', (32, 32), ORANGE, (20, 20))
-        self.images['explosion_2'] = self.load_image('explosion_2.png', (32, 32), RED, (20, 20))
-        self.images['explosion_3'] = self.load_image('explosion_3.png', (32, 32), YELLOW, (20, 20))
-        self.images['explosion_4'] = self.load_image('explosion_4.png', (32, 32), WHITE, (20, 20))
-        
-        # Path segments
-        self.images['path_straight'] = self.load_image('path_straight.png', (40, 40), BROWN, (20, 20))
-        self.images['path_curve'] = self.load_image('path_curve.png', (40, 40), BROWN, (20, 20))
-        
-        # Portal (enemy spawn point)
-        self.images['portal'] = self.load_image('portal.gif', (80, 80), PURPLE, (60, 60))
-        
-        # Sound effects
-        self.sounds['coin_pickup'] = self.load_sound('coin_pickup.mp3', 0.4)
-        self.sounds['coin_pickup_alt'] = self.load_sound('coin_pickup.wav', 0.4)  # Alternative format
-        self.sounds['enemy_death'] = self.load_sound('enemy_death.mp3', 0.7)
-        self.sounds['tower_shoot'] = self.load_sound('tower_shoot.mp3', 0.3)
+    def start_loading(self):
+        """Begin decoding every asset on a thread pool; fallback surfaces stand in meanwhile"""
+        if self.loading_started:
+            return
+        self.loading_started = True
+        self.loading = True
+        self.cache = AssetCache(os.path.join(self.base_path, self.CACHE_FILENAME))
+        
+        # Fallback-colored surfaces are available immediately for the first frame
+        for name, filename, size, fallback_color, fallback_size in IMAGE_MANIFEST:
+            self.images[name] = self.make_fallback(fallback_color, fallback_size)
+            
+        sound_manifest = SOUND_MANIFEST if self.sound_enabled else []
+        if sound_manifest:
+            self.init_mixer()
+        self.loads_total = len(IMAGE_MANIFEST) + len(ANIMATION_MANIFEST) + len(sound_manifest)
+        self.loads_pending = self.loads_total
+        
+        # Decoders release the GIL, so the pool loads files in parallel; jobs start
+        # in manifest order, which puts tower and enemy sprites first
+        self.executor = ThreadPoolExecutor(max_workers=ASSET_LOADER_THREADS)
+        for spec in IMAGE_MANIFEST:
+            self.executor.submit(self.decode_image, *spec)
+        for spec in ANIMATION_MANIFEST:
+            self.executor.submit(self.decode_animation, *spec)
+        for spec in sound_manifest:
+            self.executor.submit(self.decode_sound, *spec)
+            
+    def decode_image(self, name, filename, size, fallback_color, fallback_size):
+        """Worker: decode one image and queue it for installation on the main thread"""
+        self.completed.put(('image', name, self.load_image(filename, size, fallback_color, fallback_size)))
+        
+    def decode_animation(self, name, filename, size):
+        """Worker: decode one animated GIF and queue its frames for installation"""
+        self.completed.put(('animation', name, self.load_animation(filename, size)))
+        
+    def decode_sound(self, name, filename, volume):
+        """Worker: decode one sound and queue it for installation on the main thread"""
+        self.completed.put(('sound', name, self.load_sound(filename, volume)))
+        
+    def install(self, item):
+        """Swap a decoded asset in for its placeholder"""
+        kind, name, asset = item
+        if kind == 'image':
+            self.images[name] = asset
+            self.purge_derived(name)
+        elif kind == 'animation':
+            self.animations[name] = asset
+        else:
+            self.sounds[name] = asset
+        self.loads_pending -= 1
+        self.revision += 1
+        
+    def poll(self):
+        """Install assets decoded since the last call; returns True once everything is loaded"""
+        if not self.loading:
+            return self.assets_loaded
+        while not self.completed.empty():
+            self.install(self.completed.get_nowait())
+        if self.loads_pending == 0:
+            self.finish_loading()
+        return self.assets_loaded
+        
+    def finish_loading(self):
+        self.loading = False
+        self.executor.shutdown(wait=False)
+        self.executor = None
+        
+        # Write any newly decoded images back to the cache
+        self.cache.save()
         
         # Mark assets as loaded
         self.assets_loaded = True
+        
+    def freeze_heap(self):
+        """Once assets are loaded, move them out of the collector's tracked generations
+        
+        Assets (and everything else alive by then) stay for the whole run, which keeps
+        later collections short. The full collection this starts with is a hitch, so
+        call it only at a quiet point, never from the per-frame poll. Returns whether
+        the heap is frozen.
+        """
+        if not self.heap_frozen and self.assets_loaded and hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
+            self.heap_frozen = True
+        return self.heap_frozen
+            
+    def is_ready(self):
+        """True once every asset has been decoded and installed"""
+        if not self.loading_started:
+            self.start_loading()
+        return self.poll()
+        
+    def loading_progress(self):
+        """Fraction of assets loaded so far, from 0.0 to 1.0"""
+        if self.is_ready():
+            return 1.0
+        return (self.loads_total - self.loads_pending) / self.loads_total
+        
+    def wait_until_ready(self, timeout=None):
+        """Block until every asset is loaded or the timeout (seconds) expires"""
+        if not self.loading_started:
+            self.start_loading()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.poll():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                self.install(self.completed.get(timeout=remaining))
+            except queue.Empty:
+                return False
+        return True
+    
+    def load_all_assets(self):
+        """Load all game assets, blocking until every one has been decoded"""
+        self.start_loading()
+        self.wait_until_ready()
+        self.freeze_heap()
     
     def get_image(self, name):
-        """Get loaded image by name"""
+        """Get loaded image by name (a fallback surface while it is still loading)"""
         if not self.assets_loaded:
-            self.load_all_assets()
+            if self.loading_started:
+                self.poll()
+            else:
+                self.start_loading()
         return self.images.get(name, None)
     
+    def get_animation(self, name):
+        """Get the shared frames of an animation by name (empty while it is still loading)"""
+        if not self.assets_loaded:
+            if self.loading_started:
+                self.poll()
+            else:
+                self.start_loading()
+        return self.animations.get(name, ())
+    
     def get_sound(self, name):
         """Get loaded sound by name"""
+        if not self.sound_enabled:
+            return None
         if not self.assets_loaded:
-            self.load_all_assets()
+            if self.loading_started:
+                self.poll()
+            else:
+                self.start_loading()
         return self.sounds.get(name, None)
         
-    def play_sound(self, name):
-        """Play a sound effect by name"""
-        sound = self.get_sound(name)
-        if sound:
-            try:
-                sound.play()
-            except pygame.error:
-                pass  # Silently ignore sound errors
+    def play_sound(self, name, *fallbacks):
+        """Play a sound effect by name, or the first loaded fallback, through the voice manager"""
+        for candidate in (name,) + fallbacks:
+            sound = self.get_sound(candidate)
+            if sound:
+                return voices.play(candidate, sound)
+        return False
     
     def get_enemy_sprite(self, enemy_type, frame=0):
         """Get enemy sprite (frame parameter ignored, using single images)"""
-        return self.get_image(enemy_type)
+        return self.get_image(ENEMY_TYPES[enemy_type].sprite)
     
     def get_tower_sprite(self, tower_type, level):
         """Get tower sprite based on type (level ignored, shown via UI)"""
-        return self.get_image(f"{tower_type}_tower")
+        return self.get_image(self.tower_sprite_name(tower_type))
+    
+    def tower_sprite_name(self, tower_type):
+        """Image name of a tower type's sprite"""
+        return TOWER_TYPES[tower_type].sprite
     
     def get_projectile_sprite(self, tower_type):
         """Get projectile sprite based on tower type"""
-        projectile_map = {
-            'archer': 'arrow',
-            'magic': 'magic_bolt', 
-            'cannon': 'cannonball'
+        return self.get_image(self.projectile_sprite_name(tower_type))
+    
+    def projectile_sprite_name(self, tower_type):
+        """Image name of the projectile fired by a tower type"""
+        return TOWER_TYPES[tower_type].projectile_sprite
+    
+    def get_derived(self, name, angle=0, alpha=255, tint=None):
+        """Get a rotated, faded and/or tinted variant of a named image from the LRU cache
+        
+        angle is in degrees (counter-clockwise, as pygame.transform.rotate) and alpha
+        0-255; both are quantized so nearby values share one surface. tint is an
+        (r, g, b, a) color added over the sprite.
+        """
+        angle = round(angle / DERIVED_ANGLE_STEP) * DERIVED_ANGLE_STEP % 360
+        if alpha < 255:
+            alpha = max(0, min(255, round(alpha / DERIVED_ALPHA_STEP) * DERIVED_ALPHA_STEP))
+        key = (name, angle, alpha, tint)
+        
+        surface = self.derived.get(key)
+        if surface is not None:
+            self.derived.move_to_end(key)
+            self.derived_hits += 1
+            return surface
+            
+        base = self.get_image(name)
+        if base is None:
+            return None
+        self.derived_misses += 1
+        surface = self.make_derived(base, angle, alpha, tint)
+        
+        # Store and evict least recently used variants beyond the memory budget
+        self.derived[key] = surface
+        self.derived_bytes += self.surface_bytes(surface)
+        while self.derived_bytes > self.derived_max_bytes and len(self.derived) > 1:
+            _, evicted = self.derived.popitem(last=False)
+            self.derived_bytes -= self.surface_bytes(evicted)
+        return surface
+    
+    def purge_derived(self, name):
+        """Drop cached variants of an image whose base surface was replaced"""
+        for key in [key for key in self.derived if key[0] == name]:
+            self.derived_bytes -= self.surface_bytes(self.derived.pop(key))
+            
+    def make_derived(self, base, angle, alpha, tint):
+        """Build one derived variant of a sprite"""
+        surface = base
+        if tint:
+            surface = surface.copy()
+            overlay = pygame.Surface(surface.get_size())
+            overlay.fill(tint[:3])
+            overlay.set_alpha(tint[3])
+            surface.blit(overlay, (0, 0), special_flags=pygame.BLEND_ADD)
+        if angle:
+            surface = pygame.transform.rotate(surface, angle)
+        if alpha < 255:
+            if surface is base:
+                surface = surface.copy()
+            surface.set_alpha(alpha)
+        return surface
+    
+    def surface_bytes(self, surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+    
+    def derived_stats(self):
+        """Size and hit rate of the derived sprite cache"""
+        return {
+            'entries': len(self.derived),
+            'bytes': self.derived_bytes,
+            'max_bytes': self.derived_max_bytes,
+            'hits': self.derived_hits,
+            'misses': self.derived_misses,
         }
-        return self.get_image(projectile_map.get(tower_type, 'arrow'))
 
 # Global asset manager instance
 assets = AssetManager()
@@ -0,0 +1,195 @@
+import json
+import math
+import random
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from constants import *
+from simulation import Simulation, ManualClock
+from entity_types import TOWER_TYPES
+from assets import assets
+
+TOWER_ORDER = ["archer", "cannon", "magic"]
+
+def sample_path(path, spacing=10):
+    """Points every `spacing` pixels along the enemy path"""
+    points = []
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        length = math.hypot(x2 - x1, y2 - y1)
+        steps = max(1, int(length // spacing))
+        for i in range(steps):
+            t = i / steps
+            points.append((x1 + (x2 - x1) * t, y1 + (y2 - y1) * t))
+    points.append(path[-1])
+    return points
+
+def open_cells(sim, path_points):
+    """Grid cell centers where a tower may go, excluding cells the path runs through"""
+    path_cells = {sim.snap_to_grid(int(x), int(y)) for x, y in path_points}
+    cells = []
+    for gx in range(SCREEN_WIDTH // sim.grid_size):
+        for gy in range(SCREEN_HEIGHT // sim.grid_size):
+            x, y = sim.snap_to_grid(gx * sim.grid_size, gy * sim.grid_size)
+            if (x, y) not in path_cells and sim.can_place_tower(x, y):
+                cells.append((x, y))
+    return cells
+
+def coverage(x, y, tower_type, path_points):
+    """How many path sample points a tower at (x, y) would reach"""
+    radius_sq = TOWER_TYPES[tower_type].range ** 2
+    return sum(1 for px, py in path_points if (px - x)**2 + (py - y)**2 <= radius_sq)
+
+def upgrade_towers(sim):
+    """Spend leftover gold upgrading the lowest-level towers first"""
+    for tower in sorted(sim.towers, key=lambda tower: tower.level):
+        sim.upgrade_tower(tower)
+
+def cover_strategy(sim, rng):
+    """Build towers where they cover the most path, cycling tower types, then upgrade"""
+    path_points = sample_path(sim.path)
+    while True:
+        tower_type = TOWER_ORDER[len(sim.towers) % len(TOWER_ORDER)]
+        if sim.gold < TOWER_COSTS[tower_type]:
+            break
+        cells = open_cells(sim, path_points)
+        if not cells:
+            break
+        x, y = max(cells, key=lambda cell: coverage(cell[0], cell[1], tower_type, path_points))
+        if not sim.place_tower(x, y, tower_type):
+            break
+    upgrade_towers(sim)
+
+def random_strategy(sim, rng):
+    """Build random affordable towers on random open cells near the path, then upgrade"""
+    path_points = sample_path(sim.path)
+    while True:
+        tower_type = rng.choice(TOWER_ORDER)
+        if sim.gold < TOWER_COSTS[tower_type]:
+            break
+        cells = [cell for cell in open_cells(sim, path_points)
+                 if coverage(cell[0], cell[1], tower_type, path_points) > 0]
+        if not cells:
+            break
+        if not sim.place_tower(*rng.choice(cells), tower_type):
+            break
+    upgrade_towers(sim)
+
+STRATEGIES = {
+    "cover": cover_strategy,
+    "random": random_strategy,
+}
+
+def run_game(seed, strategy="cover", max_waves=20, vectorized=False, max_ticks=1_000_000):
+    """Play one headless game to game over or max_waves; return its results"""
+    clock = ManualClock()
+    sim = Simulation(clock, vectorized, seed)
+    place_towers = STRATEGIES[strategy]
+    strategy_rng = random.Random(f"{seed}:strategy")
+    curve = []
+
+    place_towers(sim, strategy_rng)
+    sim.start_wave()
+    ticks = 0
+    while not sim.game_over and ticks < max_ticks:
+        clock.advance(SIMULATION_STEP_MS)
+        sim.update()
+        ticks += 1
+        if sim.wave_complete:
+            curve.append({'wave': sim.wave, 'lives': sim.lives, 'gold': sim.gold, 'score': sim.score})
+            if sim.wave >= max_waves:
+                break
+            place_towers(sim, strategy_rng)
+            sim.next_wave()
+
+    sim.release_pooled()
+    return {
+        'seed': seed,
+        'waves_survived': len(curve),
+        'game_over': sim.game_over,
+        'lives_lost': STARTING_LIVES - max(0, sim.lives),
+        'gold': sim.gold,
+        'score': sim.score,
+        'towers': len(sim.towers),
+        'ticks': ticks,
+        'curve': curve,
+    }
+
+def run_game_args(args):
+    return run_game(*args)
+
+def init_worker():
+    """Worker processes never play sound or load images"""
+    assets.set_sound_enabled(False)
+
+def summarize(results, max_waves):
+    """Aggregate survival, lives lost and per-wave lives/gold curves across games"""
+    survived = [result['waves_survived'] for result in results]
+    lives_lost = [result['lives_lost'] for result in results]
+    waves = []
+    for wave in range(1, max_waves + 1):
+        points = [point for result in results for point in result['curve'] if point['wave'] == wave]
+        if not points:
+            break
+        waves.append({
+            'wave': wave,
+            'games': len(points),
+            'mean_lives': statistics.mean(point['lives'] for point in points),
+            'mean_gold': statistics.mean(point['gold'] for point in points),
+            'mean_score': statistics.mean(point['score'] for point in points),
+        })
+    return {
+        'games': len(results),
+        'waves_survived': {
+            'mean': statistics.mean(survived),
+            'median': statistics.median(survived),
+            'min': min(survived),
+            'max': max(survived),
+        },
+        'lives_lost_mean': statistics.mean(lives_lost),
+        'game_over_rate': sum(result['game_over'] for result in results) / len(results),
+        'curves': waves,
+    }
+
+def print_summary(summary):
+    survived = summary['waves_survived']
+    print(f"Games: {summary['games']}")
+    print(f"Waves survived: mean {survived['mean']:.2f}, median {survived['median']}, "
+          f"min {survived['min']}, max {survived['max']}")
+    print(f"Lives lost: mean {summary['lives_lost_mean']:.2f}, "
+          f"game over in {summary['game_over_rate'] * 100:.0f}% of games")
+    print()
+    print(f"{'Wave':>4} {'Games':>6} {'Lives':>7} {'Gold':>8} {'Score':>8}")
+    for point in summary['curves']:
+        print(f"{point['wave']:>4} {point['games']:>6} {point['mean_lives']:>7.2f} "
+              f"{point['mean_gold']:>8.1f} {point['mean_score']:>8.1f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run many headless Kingdom Defender games in parallel")
+    parser.add_argument("--games", type=int, default=32, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="cover",
+                        help="scripted tower placement strategy")
+    parser.add_argument("--max-waves", type=int, default=20, help="stop a game after this many waves")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="step enemy and projectile movement with NumPy arrays")
+    parser.add_argument("--json", metavar="PATH", help="also write per-game results and the summary as JSON")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    jobs = [(args.seed + i, args.strategy, args.max_waves, args.vectorized) for i in range(args.games)]
+
+    # Results come back in seed order whatever the scheduling, so output is reproducible
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+        results = list(executor.map(run_game_args, jobs))
+
+    summary = summarize(results, args.max_waves)
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({'config': vars(args), 'summary': summary, 'games': results}, out, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import fnmatch
+import argparse
+import platform
+import statistics
+
+# Benchmarks never open a real window or audio device
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from constants import *
+from game import Game
+from coin_pickup import CoinPickup
+from simulation import ManualClock
+from pool import pools
+from entity_types import ENEMY_TYPES, TOWER_TYPES, register_enemy_type, register_tower_type
+from assets import assets
+
+BENCHMARK_SEED = 1234  # Fixes the path and every scenario's layout
+BASE_TOWERS = ["archer", "magic", "cannon"]
+BASE_ENEMIES = ["goblin", "orc", "troll", "dragon"]
+
+ARMORED_ENEMIES = [f"armored_{name}" for name in BASE_ENEMIES]
+
+class Scenario:
+    """A scripted game state that is kept topped up while it is measured"""
+
+    def __init__(self, name, enemies=0, towers_per_type=0, tower_types=BASE_TOWERS,
+                 enemy_types=BASE_ENEMIES, coins=0):
+        self.name = name
+        self.enemies = enemies
+        self.towers_per_type = towers_per_type
+        self.tower_types = tower_types
+        self.enemy_types = enemy_types
+        self.coins = coins
+
+    def setup(self, game, rng):
+        """Place towers and fill the map with enemies and coins"""
+        sim = game.sim
+        sim.lives = 10 ** 9  # Enemies reaching the castle must not end the run
+        cells = cells_near_path(sim)
+        for i in range(self.towers_per_type * len(self.tower_types)):
+            # Cells are reused once they run out; stacked towers still cost their full work
+            x, y = cells[i % len(cells)]
+            sim.add_tower(x, y, self.tower_types[i % len(self.tower_types)])
+        self.refill(game, rng)
+
+    def refill(self, game, rng):
+        """Replace enemies and coins that finished since the last frame"""
+        sim = game.sim
+        while len(sim.enemies) < self.enemies:
+            enemy = sim.create_enemy(rng.choice(self.enemy_types))
+            place_on_path(enemy, sim.path, rng)
+            sim.enemies.append(enemy)
+        while len(sim.coin_pickups) < self.coins:
+            x = rng.uniform(0, SCREEN_WIDTH)
+            y = rng.uniform(0, SCREEN_HEIGHT - 100)
+            sim.coin_pickups.append(pools.acquire(CoinPickup, x, y, 10))
+
+class VolleyScenario(Scenario):
+    """Rapid-fire cannons against enemies that survive them, so the number of targets
+    and shots in flight stays constant
+
+    Its benchmark-only types are registered when the scenario is set up rather than
+    on import, so importing this module leaves the game's type registries alone.
+    """
+
+    def setup(self, game, rng):
+        register_tower_type(TOWER_TYPES["cannon"]._replace(name="rapid_cannon", fire_rate=100))
+        for name in BASE_ENEMIES:
+            register_enemy_type(ENEMY_TYPES[name]._replace(name=f"armored_{name}", max_health=10 ** 6))
+        super().setup(game, rng)
+
+SCENARIOS = [
+    Scenario("enemies_10", enemies=10),
+    Scenario("enemies_100", enemies=100),
+    Scenario("enemies_1000", enemies=1000),
+    Scenario("enemies_10000", enemies=10000),
+    Scenario("towers_5", enemies=100, towers_per_type=5),
+    Scenario("towers_50", enemies=100, towers_per_type=50),
+    Scenario("towers_200", enemies=100, towers_per_type=200),
+    VolleyScenario("cannon_volley", enemies=1000, towers_per_type=200, tower_types=["rapid_cannon"],
+             enemy_types=ARMORED_ENEMIES),
+    Scenario("coin_pickups_1000", coins=1000),
+]
+
+def cells_near_path(sim):
+    """Grid cell centers off the path, closest to the path first"""
+    path = sim.path
+    cells = []
+    for gx in range(SCREEN_WIDTH // sim.grid_size):
+        for gy in range((SCREEN_HEIGHT - 100) // sim.grid_size):
+            x, y = sim.snap_to_grid(gx * sim.grid_size, gy * sim.grid_size)
+            distance = min(distance_to_segment(x, y, a, b) for a, b in zip(path, path[1:]))
+            if distance >= sim.grid_size:
+                cells.append((distance, x, y))
+    cells.sort()
+    return [(x, y) for _, x, y in cells]
+
+def distance_to_segment(x, y, a, b):
+    (ax, ay), (bx, by) = a, b
+    dx, dy = bx - ax, by - ay
+    length_sq = dx*dx + dy*dy
+    t = 0 if length_sq == 0 else max(0, min(1, ((x - ax) * dx + (y - ay) * dy) / length_sq))
+    return math.hypot(ax + t * dx - x, ay + t * dy - y)
+
+def place_on_path(enemy, path, rng):
+    """Move a new enemy to a random point along the path"""
+    enemy.move_to(rng.random() * path.total_length)
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def timing_stats(samples):
+    """Median, p99 and mean of per-frame timings, in milliseconds"""
+    return {
+        'median_ms': statistics.median(samples),
+        'p99_ms': percentile(samples, 0.99),
+        'mean_ms': statistics.mean(samples),
+    }
+
+def run_scenario(scenario, frames, warmup, vectorized=False, dirty_rects=False):
+    """Measure update and draw time per frame for one scenario"""
+    clock = ManualClock()
+    game = Game(clock, vectorized, dirty_rects, seed=BENCHMARK_SEED)
+    rng = random.Random(f"{BENCHMARK_SEED}:{scenario.name}")
+    scenario.setup(game, rng)
+
+    update_times = []
+    draw_times = []
+    for frame in range(warmup + frames):
+        scenario.refill(game, rng)
+        start = time.perf_counter()
+        clock.advance(SIMULATION_STEP_MS)
+        game.update()
+        updated = time.perf_counter()
+        game.draw()
+        drawn = time.perf_counter()
+        pygame.event.pump()
+        if frame >= warmup:
+            update_times.append((updated - start) * 1000)
+            draw_times.append((drawn - updated) * 1000)
+
+    game.sim.release_pooled()
+    return {
+        'update': timing_stats(update_times),
+        'draw': timing_stats(draw_times),
+        'enemies': len(game.sim.enemies),
+        'towers': len(game.sim.towers),
+    }
+
+def compare(results, baseline, max_regression, min_delta_ms=0.0):
+    """Return (scenario, phase, baseline_ms, current_ms, change) for every median regression
+    
+    Slowdowns under min_delta_ms are ignored as timer noise.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for phase in ('update', 'draw'):
+            old = previous[phase]['median_ms']
+            new = result[phase]['median_ms']
+            change = (new - old) / old * 100 if old > 0 else 0
+            if change > max_regression and new - old >= min_delta_ms:
+                regressions.append((name, phase, old, new, change))
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Kingdom Defender update and draw times")
+    parser.add_argument("--scenario", action="append", metavar="PATTERN",
+                        help="only run scenarios matching this glob (repeatable)")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames before measuring")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="step enemy and projectile movement with NumPy arrays")
+    parser.add_argument("--dirty-rects", action="store_true", help="use dirty-rectangle rendering")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved JSON baseline")
+    parser.add_argument("--max-regression", type=float, default=10.0, metavar="PERCENT",
+                        help="with --baseline, fail if any median is this much slower (default 10)")
+    parser.add_argument("--min-delta", type=float, default=0.05, metavar="MS",
+                        help="ignore regressions smaller than this many milliseconds (default 0.05)")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenarios = SCENARIOS
+    if args.scenario:
+        scenarios = [scenario for scenario in SCENARIOS
+                     if any(fnmatch.fnmatch(scenario.name, pattern) for pattern in args.scenario)]
+    if args.list:
+        for scenario in SCENARIOS:
+            print(scenario.name)
+        return 0
+
+    assets.set_sound_enabled(False)
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    assets.wait_until_ready()  # Loading is not part of any scenario
+    assets.freeze_heap()
+
+    results = {}
+    print(f"{'Scenario':<20} {'Update med':>11} {'p99':>8} {'Draw med':>10} {'p99':>8}")
+    for scenario in scenarios:
+        result = run_scenario(scenario, args.frames, args.warmup, args.vectorized, args.dirty_rects)
+        results[scenario.name] = result
+        print(f"{scenario.name:<20} {result['update']['median_ms']:>9.3f}ms {result['update']['p99_ms']:>6.3f}ms "
+              f"{result['draw']['median_ms']:>8.3f}ms {result['draw']['p99_ms']:>6.3f}ms")
+
+    if args.save:
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'pygame': pygame.version.ver,
+                'platform': platform.platform(),
+                'frames': args.frames,
+                'vectorized': args.vectorized,
+                'dirty_rects': args.dirty_rects,
+            },
+            'scenarios': results,
+        }
+        with open(args.save, 'w') as out:
+            json.dump(report, out, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        regressions = compare(results, baseline, args.max_regression, args.min_delta)
+        for name, phase, old, new, change in regressions:
+            print(f"REGRESSION {name} {phase}: {old:.3f}ms -> {new:.3f}ms (+{change:.1f}%)")
+        if regressions:
+            return 1
+        print(f"No scenario regressed by more than {args.max_regression:g}%")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
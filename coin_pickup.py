@@ -1,36 +1,40 @@
 import pygame
 import math
+from constants import *
 from assets import assets
 
 class CoinPickup:
     """Visual effect for coin pickups when enemies are defeated"""
     
-    def __init__(self, x, y, value):
+    __slots__ = ('x', 'y', 'start_y', 'value', 'alive', 'animation_time', 'pool_generation')
+    
+    # Animation properties
+    duration = 1500  # 1.5 seconds
+    float_height = 30  # How high the coin floats up
+    fade_start = 1000  # When to start fading
+    
+    def __init__(self, x, y, value, play_sound=True):
+        self.pool_generation = 0  # Set by the object pool on every acquire
         self.x = x
         self.y = y
         self.start_y = y
         self.value = value
         self.alive = True
         
-        # Animation properties
         self.animation_time = 0
-        self.duration = 1500  # 1.5 seconds
-        self.float_height = 30  # How high the coin floats up
-        self.fade_start = 1000  # When to start fading
         
-        # Play coin pickup sound effect
-        self.play_pickup_sound()
+        # Play coin pickup sound effect (not when restored from a snapshot)
+        if play_sound:
+            self.play_pickup_sound()
         
     def play_pickup_sound(self):
         """Play coin pickup sound effect"""
         # Try coin_pickup sound first, then fallback to alternative format
-        assets.play_sound('coin_pickup')
-        if not assets.get_sound('coin_pickup'):
-            assets.play_sound('coin_pickup_alt')
+        assets.play_sound('coin_pickup', 'coin_pickup_alt')
         
     def update(self):
         """Update the coin pickup animation"""
-        self.animation_time += 16  # Roughly 60 FPS
+        self.animation_time += SIMULATION_STEP_MS  # Called once per fixed simulation step
         
         if self.animation_time >= self.duration:
             self.alive = False
@@ -42,8 +46,8 @@ class CoinPickup:
         float_progress = math.sin(progress * math.pi / 2)  # Ease out
         self.y = self.start_y - (float_progress * self.float_height)
         
-    def draw(self, screen):
-        """Draw the coin pickup effect"""
+    def queue_draw(self, render_queue):
+        """Queue the coin pickup effect for drawing"""
         if not self.alive:
             return
             
@@ -57,22 +61,12 @@ class CoinPickup:
                 fade_progress = (self.animation_time - self.fade_start) / (self.duration - self.fade_start)
                 alpha = int(255 * (1 - fade_progress))
                 
-            # Create a copy of the sprite for alpha blending
-            faded_sprite = coin_sprite.copy()
-            faded_sprite.set_alpha(alpha)
+            # Cached faded variant of the sprite
+            faded_sprite = assets.get_derived('coin_pickup', alpha=alpha)
             
             # Center the sprite on the position
-            sprite_rect = faded_sprite.get_rect()
-            sprite_rect.center = (int(self.x), int(self.y))
-            screen.blit(faded_sprite, sprite_rect)
-            
-            # Draw gold value text
-            font = pygame.font.Font(None, 20)
-            text_color = (255, 255, 0, alpha)  # Yellow with fade
-            text = font.render(f"+${self.value}", True, (255, 255, 0))
+            render_queue.add_centered('coins', faded_sprite, int(self.x), int(self.y))
             
-            # Apply alpha to text as well
-            text.set_alpha(alpha)
-            text_rect = text.get_rect()
-            text_rect.center = (int(self.x), int(self.y - 25))
-            screen.blit(text, text_rect)
+            # Gold value text, faded along with the sprite (cached per value and alpha)
+            text = render_queue.text(f"+${self.value}", 20, (255, 255, 0), alpha)
+            render_queue.add_centered('coins', text, int(self.x), int(self.y - 25))
@@ -23,6 +23,31 @@ STARTING_LIVES = 20
 WAVE_COMPLETION_BONUS = 50
 ENEMY_SPAWN_DELAY = 1000  # milliseconds
 
+# Simulation timing
+SIMULATION_TICK_RATE = 60  # Fixed simulation steps per second, independent of frame rate
+SIMULATION_STEP_MS = 1000 / SIMULATION_TICK_RATE
+MAX_CATCH_UP_STEPS = 5  # Steps run per rendered frame before a backlog is dropped (times the game speed)
+GAME_SPEEDS = (1, 2, 4, 8, 16)  # Fast-forward multipliers cycled by the speed button
+TICK_RATE_WINDOW = 0.5  # Seconds over which the measured ticks per second is averaged
+SNAPSHOT_INTERVAL_TICKS = 600  # Simulation steps between rollback snapshots (also taken at each wave start)
+SNAPSHOT_RING_SIZE = 30  # Rollback snapshots kept in memory
+
+# Rendering
+MAX_RENDER_FPS = 120  # Upper bound on drawn frames per second
+FAST_FORWARD_RENDER_FPS = 30  # Frame cap while fast-forwarding, leaving more time for simulation steps
+PROFILE_CAPTURE_FRAMES = 300  # Frames recorded by the F4 profile capture
+DIRTY_RECT_FULL_FLIP_RATIO = 0.5  # Flip the whole screen once dirty rects cover this much of it
+COVERAGE_SAMPLE_SPACING = 4  # Pixels between path samples in the placement heatmap
+COVERAGE_OVERLAY_ALPHA = 110  # Heatmap opacity of the best-covering cells
+
+# Derived sprite cache (rotated, faded and tinted variants)
+DERIVED_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DERIVED_ANGLE_STEP = 5  # degrees
+DERIVED_ALPHA_STEP = 16
+
+# Asset loading
+ASSET_LOADER_THREADS = 4  # Worker threads decoding images and sounds in the background
+
 # Tower Costs
 TOWER_COSTS = {
     "archer": 50,
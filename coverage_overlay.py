@@ -0,0 +1,76 @@
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+import pygame
+from constants import *
+from entity_types import TOWER_TYPES
+
+class CoverageOverlay:
+    """Heatmap of how much path a new tower would reach from each grid cell
+
+    Coverage is computed once per map, tower type and range as a NumPy array over the
+    grid cells. The drawable overlay is rebuilt only when towers are placed or upgraded,
+    since those change which cells are buildable. Without NumPy there is no overlay.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.coverage = {}  # (tower type, range) -> path pixels in range, per (row, column)
+        self.surface = None
+        self.surface_key = None
+
+    def coverage_for(self, sim, tower_type):
+        """Path length within range of each cell center, for the current map"""
+        if self.path is not sim.path:
+            self.path = sim.path
+            self.coverage = {}
+        tower_range = TOWER_TYPES[tower_type].range
+        key = (tower_type, tower_range)
+        coverage = self.coverage.get(key)
+        if coverage is None:
+            coverage = self.coverage[key] = self.compute(sim, tower_range)
+        return coverage
+
+    def compute(self, sim, tower_range):
+        path = sim.path
+        grid = sim.occupancy
+        spacing = COVERAGE_SAMPLE_SPACING
+        samples = np.array([path.position_at(d) for d in np.arange(0, path.total_length, spacing)])
+        centers_x = (np.arange(grid.columns) + 0.5) * grid.cell_size
+        centers_y = (np.arange(grid.rows) + 0.5) * grid.cell_size
+        dx = centers_x[None, :, None] - samples[:, 0]
+        dy = centers_y[:, None, None] - samples[:, 1]
+        return np.count_nonzero(dx*dx + dy*dy <= tower_range * tower_range, axis=2) * spacing
+
+    def surface_for(self, sim, tower_type):
+        """Screen-sized overlay for the dragged tower type, or None without NumPy"""
+        if not NUMPY_AVAILABLE:
+            return None
+        coverage = self.coverage_for(sim, tower_type)
+        key = (self.path, tower_type, TOWER_TYPES[tower_type].range, sim.tower_revision)
+        if self.surface_key != key:
+            self.surface = self.build_surface(sim, coverage)
+            self.surface_key = key
+        return self.surface
+
+    def build_surface(self, sim, coverage):
+        grid = sim.occupancy
+        half = grid.cell_size // 2
+        buildable = np.array([[grid.can_place(cx * grid.cell_size + half, cy * grid.cell_size + half)
+                               for cx in range(grid.columns)] for cy in range(grid.rows)])
+        heat = np.where(buildable, coverage, 0) / max(1, coverage.max())
+
+        # One pixel per cell, yellow for a little coverage shading to red for the most,
+        # then scaled up without smoothing so cells stay crisp
+        cells = pygame.Surface((grid.columns, grid.rows), pygame.SRCALPHA)
+        rgb = pygame.surfarray.pixels3d(cells)
+        rgb[..., 0] = 255
+        rgb[..., 1] = (220 * (1 - heat)).T
+        rgb[..., 2] = 0
+        del rgb
+        alpha = pygame.surfarray.pixels_alpha(cells)
+        alpha[...] = np.where(heat > 0, 40 + heat * (COVERAGE_OVERLAY_ALPHA - 40), 0).T
+        del alpha
+        return pygame.transform.scale(cells, (grid.columns * grid.cell_size, grid.rows * grid.cell_size))
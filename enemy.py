@@ -1,73 +1,80 @@
 import pygame
-import math
 from constants import *
 from assets import assets
+from entity_types import ENEMY_TYPES
 
 class Enemy:
+    __slots__ = ('enemy_type', 'stats', 'path', 'path_index', 'distance', 'x', 'y', 'prev_x', 'prev_y',
+                 'health', 'alive', 'animation_frame', 'animation_timer',
+                 'pool_generation')
+    animation_speed = 500  # milliseconds per frame
+    
     def __init__(self, enemy_type, path):
+        self.pool_generation = 0  # Set by the object pool on every acquire
         self.enemy_type = enemy_type
-        self.path = path
-        self.path_index = 0
+        self.stats = ENEMY_TYPES[enemy_type]  # Shared per-type stats
+        self.path = path  # Polyline with precomputed segment lengths
+        self.path_index = 0  # Segment currently being walked
+        self.distance = 0.0  # Distance travelled along the path; position follows from it
         self.x = path[0][0]
         self.y = path[0][1]
-        self.target_x = path[1][0]
-        self.target_y = path[1][1]
+        self.prev_x = self.x  # Position at the previous tick, for render interpolation
+        self.prev_y = self.y
         
-        # Enemy stats based on type
-        if enemy_type == "goblin":
-            self.max_health = 50
-            self.speed = 2
-            self.reward = 10
-            self.color = GREEN
-            self.size = 15
-        elif enemy_type == "orc":
-            self.max_health = 100
-            self.speed = 1.5
-            self.reward = 20
-            self.color = DARK_GREEN
-            self.size = 20
-        elif enemy_type == "troll":
-            self.max_health = 200
-            self.speed = 1.6
-            self.reward = 40
-            self.color = BROWN
-            self.size = 25
-        elif enemy_type == "dragon":
-            self.max_health = 500
-            self.speed = 3
-            self.reward = 100
-            self.color = RED
-            self.size = 30
-            
-        self.health = self.max_health
+        self.health = self.stats.max_health
         self.alive = True
         self.animation_frame = 0
         self.animation_timer = 0
-        self.animation_speed = 500  # milliseconds per frame
+        
+    @property
+    def max_health(self):
+        return self.stats.max_health
+    
+    @property
+    def speed(self):
+        return self.stats.speed
+    
+    @property
+    def reward(self):
+        return self.stats.reward
+    
+    @property
+    def color(self):
+        return self.stats.color
+    
+    @property
+    def size(self):
+        return self.stats.size
+    
+    @property
+    def progress(self):
+        """Fraction of the path covered, from 0 at the portal to 1 at the castle"""
+        return min(1.0, self.distance / self.path.total_length) if self.path.total_length else 1.0
         
     def update(self):
         if not self.alive:
             return
             
-        # Move towards target point
-        dx = self.target_x - self.x
-        dy = self.target_y - self.y
-        distance = math.sqrt(dx*dx + dy*dy)
+        self.prev_x = self.x
+        self.prev_y = self.y
         
-        if distance < 5:  # Reached target point
-            self.path_index += 1
-            if self.path_index >= len(self.path):
-                self.alive = False
-                return "reached_end"
-            else:
-                self.target_x = self.path[self.path_index][0]
-                self.target_y = self.path[self.path_index][1]
-        else:
-            # Move towards target
-            self.x += (dx / distance) * self.speed
-            self.y += (dy / distance) * self.speed
-            
+        # Walk along the path; the segment index only ever moves forward
+        self.distance += self.stats.speed
+        path = self.path
+        if self.distance >= path.total_length:
+            self.x, self.y = path[-1]
+            self.alive = False
+            return "reached_end"
+        self.path_index = path.segment_at(self.distance, self.path_index)
+        self.x, self.y = path.point_on_segment(self.path_index, self.distance)
         return None
+    
+    def move_to(self, distance):
+        """Place the enemy at a distance along the path, without interpolating from its old position"""
+        path = self.path
+        self.distance = distance
+        self.path_index = path.segment_at(distance)
+        self.x, self.y = self.prev_x, self.prev_y = path.point_on_segment(self.path_index, distance)
         
     def take_damage(self, damage):
         self.health -= damage
@@ -76,33 +83,41 @@ class Enemy:
             return True
         return False
         
-    def update_animation(self):
+    def update_animation(self, current_time=None):
         """Update animation frame for walking"""
-        current_time = pygame.time.get_ticks()
+        if current_time is None:
+            current_time = pygame.time.get_ticks()
         if current_time - self.animation_timer >= self.animation_speed:
             self.animation_frame = 1 if self.animation_frame == 0 else 0
             self.animation_timer = current_time
     
-    def draw(self, screen):
+    def render_position(self, alpha):
+        """Position blended between the previous and current tick"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+    
+    def queue_draw(self, render_queue, current_time=None, alpha=1.0):
+        """Queue the enemy and its health bar for drawing
+        
+        alpha is how far the frame lies between the last two simulation ticks.
+        """
         if self.alive:
             # Update animation
-            self.update_animation()
+            self.update_animation(current_time)
+            x, y = self.render_position(alpha)
+            x, y = int(x), int(y)
+            
+            stats = self.stats
             
             # Try to get sprite from assets
             sprite = assets.get_enemy_sprite(self.enemy_type, self.animation_frame)
             
-            if sprite and sprite.get_width() > 0:  # Valid sprite loaded
-                # Draw sprite centered
-                sprite_rect = sprite.get_rect()
-                sprite_rect.center = (int(self.x), int(self.y))
-                screen.blit(sprite, sprite_rect)
-            else:
+            if not (sprite and sprite.get_width() > 0):  # No valid sprite loaded
                 # Fallback to colored circle
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
+                sprite = render_queue.circle(stats.color, stats.size)
+            render_queue.add_centered('enemies', sprite, x, y)
             
-            # Draw health bar
-            bar_width = self.size * 2
-            bar_height = 4
-            health_ratio = self.health / self.max_health
-            pygame.draw.rect(screen, RED, (int(self.x) - bar_width//2, int(self.y) - self.size - 15, bar_width, bar_height))
-            pygame.draw.rect(screen, GREEN, (int(self.x) - bar_width//2, int(self.y) - self.size - 15, bar_width * health_ratio, bar_height))
+            # Health bar, pre-rendered per width and fill
+            bar_width = stats.size * 2
+            bar = render_queue.health_bar(bar_width, self.health / stats.max_health)
+            render_queue.add('health_bars', bar, (x - bar_width//2, y - stats.size - 15))
@@ -0,0 +1,331 @@
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+from enemy import Enemy
+from projectile import Projectile
+from pool import pools
+from progress_index import ProgressIndex
+
+# Projectile states written by ProjectileArrays.step
+PROJECTILE_MOVING = 0
+PROJECTILE_HIT = 1
+PROJECTILE_LOST = 2
+
+def array_field(name):
+    """Property that reads and writes one slot of a named array on the owning store"""
+    def get(self):
+        return getattr(self._store, name)[self._slot]
+
+    def set(self, value):
+        getattr(self._store, name)[self._slot] = value
+
+    return property(get, set)
+
+class ArrayStore:
+    """Slot allocator over a set of parallel NumPy arrays"""
+
+    FIELDS = {}
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.in_use = np.zeros(capacity, dtype=bool)
+        self.owners = [None] * capacity
+        self.free_slots = list(range(capacity - 1, -1, -1))  # Lowest slot pops first
+        self.count = 0
+
+    def grow(self):
+        """Double capacity, copying existing slots"""
+        new_capacity = self.capacity * 2
+        for name in list(self.FIELDS) + ['in_use']:
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.owners.extend([None] * self.capacity)
+        self.free_slots.extend(range(new_capacity - 1, self.capacity - 1, -1))
+        self.capacity = new_capacity
+
+    def allocate(self, owner):
+        """Claim a zeroed slot for an entity view"""
+        if not self.free_slots:
+            self.grow()
+        slot = self.free_slots.pop()
+        for name in self.FIELDS:
+            getattr(self, name)[slot] = 0
+        self.in_use[slot] = True
+        self.owners[slot] = owner
+        self.count += 1
+        return slot
+
+    def release(self, slot):
+        """Return a slot to the free list"""
+        if not self.in_use[slot]:
+            return
+        self.in_use[slot] = False
+        self.owners[slot] = None
+        self.free_slots.append(slot)
+        self.count -= 1
+
+class EnemyArrays(ArrayStore):
+    """Path distances, positions, speeds and segment indices for every enemy on one path"""
+
+    FIELDS = {
+        'x': 'f8',
+        'y': 'f8',
+        'prev_x': 'f8',
+        'prev_y': 'f8',
+        'distance': 'f8',
+        'speed': 'f8',
+        'path_index': 'i8',
+        'alive': '?',
+        'generation': 'i8',
+    }
+
+    def __init__(self, path, capacity=256):
+        super().__init__(capacity)
+        self.path = path
+        self.path_x = np.array([point[0] for point in path], dtype=np.float64)
+        self.path_y = np.array([point[1] for point in path], dtype=np.float64)
+        self.cumulative = np.array(path.cumulative, dtype=np.float64)
+        self.unit_x = np.array(path.unit_x, dtype=np.float64)
+        self.unit_y = np.array(path.unit_y, dtype=np.float64)
+        self.last_segment = len(path) - 2
+        self.next_generation = 1
+
+    def allocate(self, owner):
+        # Stamp a fresh generation so stale projectile references can be detected
+        slot = super().allocate(owner)
+        self.generation[slot] = self.next_generation
+        self.next_generation += 1
+        return slot
+
+    def create(self, enemy_type):
+        """Create an enemy view backed by a new slot"""
+        return pools.acquire(ArrayEnemy, enemy_type, self.path, self)
+
+    def step(self):
+        """Advance every live enemy one tick; return (reached_end, killed) enemy lists"""
+        # Enemies killed by towers since the last step are reported before moving
+        killed_slots = np.flatnonzero(self.in_use & ~self.alive)
+        idx = np.flatnonzero(self.in_use & self.alive)
+        self.prev_x[idx] = self.x[idx]
+        self.prev_y[idx] = self.y[idx]
+
+        distance = self.distance[idx] + self.speed[idx]
+        self.distance[idx] = distance
+
+        at_end = distance >= self.cumulative[-1]
+        end_slots = idx[at_end]
+        self.alive[end_slots] = False
+        self.x[end_slots] = self.path_x[-1]
+        self.y[end_slots] = self.path_y[-1]
+
+        # Segment s holds distances in (cumulative[s], cumulative[s + 1]], as in Polyline.segment_at
+        move_idx = idx[~at_end]
+        distance = distance[~at_end]
+        segment = np.clip(np.searchsorted(self.cumulative, distance, side='left') - 1, 0, self.last_segment)
+        offset = distance - self.cumulative[segment]
+        self.path_index[move_idx] = segment
+        self.x[move_idx] = self.path_x[segment] + self.unit_x[segment] * offset
+        self.y[move_idx] = self.path_y[segment] + self.unit_y[segment] * offset
+
+        owners = self.owners
+        reached_end = [owners[slot] for slot in end_slots]
+        killed = [owners[slot] for slot in killed_slots]
+        return reached_end, killed
+
+class ProjectileArrays(ArrayStore):
+    """Positions, speeds and target slots for every projectile in flight"""
+
+    FIELDS = {
+        'x': 'f8',
+        'y': 'f8',
+        'prev_x': 'f8',
+        'prev_y': 'f8',
+        'speed': 'f8',
+        'angle': 'f8',
+        'active': '?',
+        'state': 'i1',
+        'target_slot': 'i8',
+        'target_generation': 'i8',
+    }
+
+    def __init__(self, enemy_arrays, capacity=256):
+        super().__init__(capacity)
+        self.enemy_arrays = enemy_arrays
+
+    def create(self, x, y, target, damage, color, speed, tower_type="archer"):
+        """Create a projectile view backed by a new slot"""
+        return pools.acquire(ArrayProjectile, x, y, target, damage, color, speed, tower_type, self)
+
+    def step(self):
+        """Move every projectile one tick and flag hits and lost targets"""
+        enemies = self.enemy_arrays
+        idx = np.flatnonzero(self.in_use & self.active)
+        target = self.target_slot[idx]
+
+        # Targets that died or whose slot was reused are lost
+        valid = (enemies.in_use[target] & enemies.alive[target] &
+                 (enemies.generation[target] == self.target_generation[idx]))
+        self.state[idx[~valid]] = PROJECTILE_LOST
+        idx = idx[valid]
+        target = target[valid]
+        self.prev_x[idx] = self.x[idx]
+        self.prev_y[idx] = self.y[idx]
+
+        dx = enemies.x[target] - self.x[idx]
+        dy = enemies.y[target] - self.y[idx]
+        distance = np.sqrt(dx*dx + dy*dy)
+        hit = distance < 5
+        self.state[idx[hit]] = PROJECTILE_HIT
+
+        moving = ~hit
+        move_idx = idx[moving]
+        move_distance = distance[moving]
+        speed = self.speed[move_idx]
+        self.x[move_idx] += (dx[moving] / move_distance) * speed
+        self.y[move_idx] += (dy[moving] / move_distance) * speed
+        # Calculate angle for sprite rotation
+        self.angle[move_idx] = np.degrees(np.arctan2(dy[moving], dx[moving]))
+
+class ArraySpatialHash:
+    """Grid index over EnemyArrays slots, bucketed with one sort per tick"""
+
+    KEY_STRIDE = 1 << 20
+
+    def __init__(self, cell_size, store):
+        self.cell_size = cell_size
+        self.store = store
+        self.cells = {}
+        self.sorted_slots = np.empty(0, dtype=np.int64)
+
+    def cell_key(self, cx, cy):
+        return cx * self.KEY_STRIDE + cy
+
+    def rebuild(self, enemies=None):
+        """Re-bucket every live enemy slot; the enemy list is read from the store"""
+        store = self.store
+        slots = np.flatnonzero(store.in_use & store.alive)
+        cx = np.floor_divide(store.x[slots], self.cell_size).astype(np.int64)
+        cy = np.floor_divide(store.y[slots], self.cell_size).astype(np.int64)
+        keys = self.cell_key(cx, cy)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        self.sorted_slots = slots[order]
+
+        # Each cell maps to a contiguous run of the sorted slot array
+        unique_keys, starts = np.unique(sorted_keys, return_index=True)
+        ends = np.append(starts[1:], len(sorted_keys))
+        self.cells = dict(zip(unique_keys.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def nearest(self, x, y, radius):
+        """Closest live enemy within radius, ties going to the earliest spawned"""
+        cells = self.cells
+        cell_size = self.cell_size
+        min_cx, max_cx = int((x - radius) // cell_size), int((x + radius) // cell_size)
+        min_cy, max_cy = int((y - radius) // cell_size), int((y + radius) // cell_size)
+        runs = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                run = cells.get(self.cell_key(cx, cy))
+                if run:
+                    runs.append(self.sorted_slots[run[0]:run[1]])
+        if not runs:
+            return None
+
+        store = self.store
+        candidates = np.concatenate(runs)
+        # Towers earlier in the tick may have killed some candidates
+        candidates = candidates[store.alive[candidates]]
+        dx = store.x[candidates] - x
+        dy = store.y[candidates] - y
+        distance_sq = dx*dx + dy*dy
+        in_range = distance_sq <= radius * radius
+        if not in_range.any():
+            return None
+        candidates = candidates[in_range]
+        distance_sq = distance_sq[in_range]
+        # Generation increases with every spawn, so it matches list order
+        best = np.lexsort((store.generation[candidates], distance_sq))[0]
+        return store.owners[candidates[best]]
+
+class ArrayProgressIndex(ProgressIndex):
+    """ProgressIndex ordered with one argsort over the EnemyArrays distances"""
+
+    def __init__(self, path, store):
+        super().__init__(path)
+        self.store = store
+
+    def refresh(self):
+        store = self.store
+        slots = np.flatnonzero(store.in_use & store.alive)
+        # Generation breaks ties so equal distances keep spawn order, newest first
+        slots = slots[np.lexsort((-store.generation[slots], store.distance[slots]))]
+        self.distances = store.distance[slots].tolist()
+        owners = store.owners
+        self.order = [owners[slot] for slot in slots]
+        self.stale = False
+
+class ArrayEnemy(Enemy):
+    """Enemy whose movement state is a view over an EnemyArrays slot"""
+
+    __slots__ = ('_store', '_slot')
+
+    x = array_field('x')
+    y = array_field('y')
+    prev_x = array_field('prev_x')
+    prev_y = array_field('prev_y')
+    distance = array_field('distance')
+    speed = array_field('speed')
+    path_index = array_field('path_index')
+    alive = array_field('alive')
+
+    def __init__(self, enemy_type, path, store):
+        self._store = store
+        self._slot = store.allocate(self)
+        super().__init__(enemy_type, path)
+        self.speed = self.stats.speed  # The movement kernel reads speed from the array
+
+    def update(self):
+        # Movement is advanced in bulk by EnemyArrays.step
+        return None
+
+class ArrayProjectile(Projectile):
+    """Projectile whose movement state is a view over a ProjectileArrays slot"""
+
+    __slots__ = ('_store', '_slot')
+
+    x = array_field('x')
+    y = array_field('y')
+    prev_x = array_field('prev_x')
+    prev_y = array_field('prev_y')
+    speed = array_field('speed')
+    angle = array_field('angle')
+    active = array_field('active')
+
+    def __init__(self, x, y, target, damage, color, speed, tower_type, store):
+        self._store = store
+        self._slot = store.allocate(self)
+        super().__init__(x, y, target, damage, color, speed, tower_type)
+        store.target_slot[self._slot] = target._slot
+        store.target_generation[self._slot] = target._store.generation[target._slot]
+        store.state[self._slot] = PROJECTILE_MOVING
+
+    def update(self, enemies):
+        # Movement and arrival were computed by ProjectileArrays.step
+        state = self._store.state[self._slot]
+        if not self.active or state == PROJECTILE_LOST or not self.target.alive:
+            return self.finish(False, None)
+        if state == PROJECTILE_HIT:
+            return self.finish(*self.hit())
+        return False, None
+
+    def finish(self, killed, effect):
+        """Deactivate and give the slot back to the store"""
+        self.active = False
+        self._store.release(self._slot)
+        return killed, effect
@@ -0,0 +1,57 @@
+from collections import namedtuple
+from constants import *
+
+# Immutable per-type stats shared by every entity of that type. Adding a type is a
+# matter of registering another record; entities keep only per-instance state.
+
+EnemyStats = namedtuple('EnemyStats', [
+    'name',
+    'max_health',
+    'speed',       # pixels per simulation step
+    'reward',      # gold and score for a kill
+    'color',       # fallback circle color
+    'size',        # fallback circle radius; also positions the health bar
+    'sprite',      # image name in the asset manager
+])
+
+TowerStats = namedtuple('TowerStats', [
+    'name',
+    'damage',            # at level 1
+    'range',             # at level 1, in pixels
+    'fire_rate',         # milliseconds between shots
+    'cost',
+    'color',             # fallback circle color
+    'projectile_color',  # fallback projectile color
+    'projectile_speed',  # pixels per simulation step
+    'sprite',            # image name in the asset manager
+    'projectile_sprite',
+    'impact_effect',     # VisualEffect type played on a hit, or None
+])
+
+ENEMY_TYPES = {}
+TOWER_TYPES = {}
+
+def register_enemy_type(stats):
+    """Add or replace an enemy type"""
+    ENEMY_TYPES[stats.name] = stats
+    return stats
+
+def register_tower_type(stats):
+    """Add or replace a tower type"""
+    TOWER_TYPES[stats.name] = stats
+    return stats
+
+register_enemy_type(EnemyStats('goblin', max_health=50, speed=2, reward=10, color=GREEN, size=15, sprite='goblin'))
+register_enemy_type(EnemyStats('orc', max_health=100, speed=1.5, reward=20, color=DARK_GREEN, size=20, sprite='orc'))
+register_enemy_type(EnemyStats('troll', max_health=200, speed=1.6, reward=40, color=BROWN, size=25, sprite='troll'))
+register_enemy_type(EnemyStats('dragon', max_health=500, speed=3, reward=100, color=RED, size=30, sprite='dragon'))
+
+register_tower_type(TowerStats('archer', damage=15, range=80, fire_rate=1000, cost=TOWER_COSTS["archer"],
+                               color=GREEN, projectile_color=YELLOW, projectile_speed=8,
+                               sprite='archer_tower', projectile_sprite='arrow', impact_effect=None))
+register_tower_type(TowerStats('magic', damage=25, range=70, fire_rate=1500, cost=TOWER_COSTS["magic"],
+                               color=BLUE, projectile_color=PURPLE, projectile_speed=10,
+                               sprite='magic_tower', projectile_sprite='magic_bolt', impact_effect='sparkle'))
+register_tower_type(TowerStats('cannon', damage=40, range=100, fire_rate=2000, cost=TOWER_COSTS["cannon"],
+                               color=RED, projectile_color=BLACK, projectile_speed=6,
+                               sprite='cannon_tower', projectile_sprite='cannonball', impact_effect='explosion'))
@@ -1,34 +1,55 @@
 import pygame
 import math
 import os
+import random
 from constants import *
+from assets import assets
 
-class VisualEffect:
-    def __init__(self, x, y, effect_type="explosion"):
-        self.x = x
-        self.y = y
-        self.effect_type = effect_type
-        self.current_frame = 0
-        self.animation_speed = 3  # Frames to wait before advancing animation
-        self.frame_counter = 0
-        self.active = True
-        self.frames = []
+class EffectFrameBank:
+    """Builds each effect's animation once and shares the read-only frames"""
+    
+    def __init__(self):
+        self.frames = {}  # effect type -> (frames, animation_speed)
+        self.drawn_explosion = None
+        self.provisional = {}  # effect type -> asset revision it was built against while loading
         
-        # Load appropriate effect frames based on type
+    def get_frames(self, effect_type):
+        """Return (frames, animation_speed) for an effect type, building it on first use"""
+        entry = self.frames.get(effect_type)
+        if entry is None or self.provisional.get(effect_type, assets.revision) != assets.revision:
+            entry = self.build(effect_type)
+            self.frames[effect_type] = entry
+        return entry
+    
+    def build(self, effect_type):
+        """Pick the frames and animation speed (ticks per frame) for an effect type"""
+        self.provisional.pop(effect_type, None)
         if effect_type == "explosion":
-            self.load_explosion_frames()
-        elif effect_type == "sparkle":
-            self.load_sparkle_frames()
-        else:
-            self.active = False  # No effect
-        
-    def load_explosion_frames(self):
-        """Create explosion animation frames"""
-        # Since PIL is not available, create a beautiful animated explosion using pygame
-        self.create_animated_explosion()
-            
+            # Use explode.gif once the asset manager has decoded it. Headless simulations
+            # never start the loader, so only look at what is already installed then
+            if assets.loading_started:
+                sheet = assets.get_animation('explode')
+            else:
+                sheet = assets.animations.get('explode', ())
+            if sheet:
+                return sheet, 6  # Four GIF frames spread over the same time as the drawn explosion
+            if not assets.assets_loaded:
+                self.provisional[effect_type] = assets.revision
+            if self.drawn_explosion is None:
+                self.drawn_explosion = tuple(self.create_animated_explosion())
+            return self.drawn_explosion, 3  # Frames to wait before advancing animation
+        if effect_type == "sparkle":
+            return tuple(self.load_sparkle_frames()), 5  # Slower for longer-lasting sparkles
+        return (), 3
+    
+    def preload(self):
+        """Build every effect up front so the first hit doesn't pay for it"""
+        for effect_type in ("explosion", "sparkle"):
+            self.get_frames(effect_type)
+    
     def create_animated_explosion(self):
-        """Create beautiful animated explosion frames"""
+        """Create beautiful animated explosion frames (used when explode.gif is unavailable)"""
+        frames = []
         # Create a more sophisticated explosion animation
         explosion_data = [
             # Frame 1: Initial flash
@@ -67,11 +88,15 @@ class VisualEffect:
                 circle_surface.set_alpha(circle['alpha'])
                 surface.blit(circle_surface, (0, 0))
                 
-            self.frames.append(surface)
+            frames.append(surface)
+            
+        return frames
             
     def load_sparkle_frames(self):
         """Create purple sparkle animation frames for magic towers"""
-        import random
+        frames = []
+        # Private RNG for a consistent sparkle pattern without reseeding the global one
+        rng = random.Random(42)
         
         sparkle_data = [
             # Frame 1: Initial sparkle burst
@@ -94,18 +119,15 @@ class VisualEffect:
             {'particles': 4, 'base_color': (80, 40, 120), 'size_range': (1, 1), 'alpha': 50}
         ]
         
-        # Set animation speed slower for longer-lasting sparkles
-        self.animation_speed = 5
-        
         for frame_data in sparkle_data:
             surface = pygame.Surface((64, 64), pygame.SRCALPHA)
             
-            # Create random sparkle positions for this frame
-            random.seed(42)  # Consistent sparkle pattern
+            # Create random sparkle positions for this frame (same pattern every frame)
+            rng.seed(42)
             for _ in range(frame_data['particles']):
                 # Random position around center
-                angle = random.uniform(0, 6.28)  # 2 * pi
-                distance = random.uniform(5, 20)
+                angle = rng.uniform(0, 6.28)  # 2 * pi
+                distance = rng.uniform(5, 20)
                 x = 32 + int(distance * math.cos(angle))
                 y = 32 + int(distance * math.sin(angle))
                 
@@ -113,10 +135,10 @@ class VisualEffect:
                 x = max(1, min(63, x))
                 y = max(1, min(63, y))
                 
-                size = random.randint(*frame_data['size_range'])
+                size = rng.randint(*frame_data['size_range'])
                 
                 # Create sparkle with slight color variation
-                color_var = random.randint(-30, 30)
+                color_var = rng.randint(-30, 30)
                 color = (
                     max(0, min(255, frame_data['base_color'][0] + color_var)),
                     max(0, min(255, frame_data['base_color'][1] + color_var)),
@@ -129,10 +151,33 @@ class VisualEffect:
                 particle_surface.set_alpha(frame_data['alpha'])
                 surface.blit(particle_surface, (x-size-1, y-size-1))
                 
-            self.frames.append(surface)
+            frames.append(surface)
+            
+        return frames
+    
+# Shared frames for every VisualEffect instance
+frame_bank = EffectFrameBank()
+
+class VisualEffect:
+    __slots__ = ('x', 'y', 'effect_type', 'current_frame', 'frame_counter', 'active',
+                 'frames', 'animation_speed', 'pool_generation')
     
+    def __init__(self, x, y, effect_type="explosion"):
+        self.pool_generation = 0  # Set by the object pool on every acquire
+        self.x = x
+        self.y = y
+        self.effect_type = effect_type
+        self.current_frame = 0
+        self.frame_counter = 0
+        self.active = True
+        
+        # Index into the shared, read-only frames for this effect type
+        self.frames, self.animation_speed = frame_bank.get_frames(effect_type)
+        if not self.frames:
+            self.active = False  # No effect
+        
     def update(self):
-        """Update the explosion animation"""
+        """Advance the animation by one fixed simulation step"""
         if not self.active:
             return False
             
@@ -149,11 +194,7 @@ class VisualEffect:
                 
         return True
     
-    def draw(self, screen):
-        """Draw the current explosion frame"""
+    def queue_draw(self, render_queue):
+        """Queue the current explosion frame, centered on the position"""
         if self.active and self.current_frame < len(self.frames):
-            frame = self.frames[self.current_frame]
-            # Center the explosion on the position
-            rect = frame.get_rect()
-            rect.center = (int(self.x), int(self.y))
-            screen.blit(frame, rect)
+            render_queue.add_centered('effects', self.frames[self.current_frame], int(self.x), int(self.y))
@@ -1,32 +1,54 @@
 import pygame
-import math
 import random
 from constants import *
-from enemy import Enemy
-from tower import Tower
-from coin_pickup import CoinPickup
 from portal import Portal
+from occupancy import path_tiles
+from coverage_overlay import CoverageOverlay
+from explosion import frame_bank
+from simulation import Simulation, ManualClock
 from assets import assets
+from profiler import profiler, RateMeter
+from voices import voices
+from render_queue import RenderQueue
+from snapshot import SnapshotRing
 
 class Game:
-    def __init__(self):
+    """Pygame renderer and input handler over a Simulation"""
+
+    def __init__(self, tick_source=None, vectorized=False, dirty_rects=False, seed=None, recorder=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("</>")
         self.clock = pygame.time.Clock()
         
-        # Game state
-        self.gold = STARTING_GOLD
-        self.lives = STARTING_LIVES
-        self.wave = 1
-        self.score = 0
-        self.game_over = False
-        self.wave_in_progress = False
-        self.wave_complete = False
-        
-        # Game objects
-        self.enemies = []
-        self.towers = []
-        self.coin_pickups = []
+        # Game state and update logic. Simulation time only moves in fixed steps
+        # (see advance) unless a tick source without an advance method, such as
+        # pygame.time.get_ticks, is injected; that clock then runs on its own.
+        if tick_source is None:
+            tick_source = ManualClock()
+        self.sim = Simulation(tick_source, vectorized, seed)
+        
+        # Optional input recorder (see replay.py); needs a seeded simulation
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.begin(self.sim)
+        
+        # Background texture gets its own stream so it never shifts the simulation's
+        self.rng = random.Random(f"{seed}:background") if seed is not None else random
+        self.accumulator = 0.0  # Real time not yet consumed by simulation steps (ms)
+        
+        # Recent snapshots to roll back to, tagged with the step they were taken on
+        self.ticks = 0
+        self.snapshots = SnapshotRing()
+        self.last_snapshot_state = None
+        
+        # Fast-forward: each real millisecond is worth `speed` simulated ones
+        self.speed = GAME_SPEEDS[0]
+        self.tick_meter = RateMeter(TICK_RATE_WINDOW)  # Simulation steps actually run per second
+        # Between the widest Upgrade label and the stat icons, with the tick rate below it
+        self.speed_button = pygame.Rect(655, SCREEN_HEIGHT - 80, 100, 30)
+        self.targeting_button = pygame.Rect(520, SCREEN_HEIGHT - 45, 100, 30)
+        
+        # UI selection state
         self.selected_tower_type = "archer"
         self.selected_tower = None
         
@@ -36,88 +58,41 @@ class Game:
         self.drag_start_pos = None
         self.mouse_pos = (0, 0)
         
-        # Grid settings for background (needed before path generation)
-        self.grid_size = 40  # Size of each grid cell
+        # Grid settings for background
+        self.grid_size = self.sim.grid_size
         self.background_surface = None
         self.create_grid_background()
         
-        # Generate randomized path
-        self.path = self.generate_random_path()
+        # Background, path and castle composited once per map
+        self.static_layer = None
+        self.static_layer_path = None
+        self.static_layer_revision = None
+        
+        # Optional dirty-rectangle rendering: only changed areas are pushed to the display
+        self.dirty_rects = dirty_rects
+        self.tower_layer = None
+        self.tower_layer_key = None
+        self.previous_dirty = []
+        self.full_redraw_pending = True
+        self.ui_rect = pygame.Rect(0, SCREEN_HEIGHT - 100, SCREEN_WIDTH, 100)
+        self.ui_state = None
         
         # Create portal at enemy spawn location (first point in path)
-        self.portal = Portal(self.path[0][0], self.path[0][1])
+        self.portal = Portal(self.sim.path[0][0], self.sim.path[0][1])
+        
+        # Entity sprites are collected per layer and blitted in batches
+        self.render_queue = RenderQueue()
         
-        # Wave management
-        self.wave_enemies = []
-        self.enemy_spawn_timer = 0
-        self.enemy_spawn_delay = ENEMY_SPAWN_DELAY
-        self.wave_start_time = 0
+        # Heatmap of path coverage shown while dragging a new tower
+        self.coverage_overlay = CoverageOverlay()
+        
+        # Build shared effect animations now rather than on the first hit
+        frame_bank.preload()
         
         # UI
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
-        
-    def generate_random_path(self):
-        """Generate a randomized blocky path from left to right with curves, aligned to grid"""
-        path_points = []
-        
-        # Starting position (left side) - snap to grid
-        start_x = 60
-        start_y_grid = random.randint(4, 12)  # Random grid row (160px to 480px)
-        start_y = start_y_grid * self.grid_size + self.grid_size // 2
-        path_points.append((start_x, start_y))
-        
-        # Generate intermediate points with blocky curves
-        current_x = start_x
-        current_y = start_y
-        
-        # Create 8-12 segments for the path
-        num_segments = random.randint(8, 12)
-        segment_width = (SCREEN_WIDTH - 120) // num_segments  # Leave space for castle
-        
-        for i in range(1, num_segments):
-            # Move right by segment width (snap to grid)
-            current_x += segment_width
-            current_x = (current_x // self.grid_size) * self.grid_size + self.grid_size // 2
-            
-            # Add vertical variation (curves) - snap to grid
-            if i < num_segments // 2:
-                # First half can curve up or down (in grid increments)
-                vertical_change = random.choice([-2, -1, 0, 1, 2]) * self.grid_size
-                current_y += vertical_change
-            else:
-                # Second half should generally move toward center for castle approach
-                target_y_grid = (SCREEN_HEIGHT // 2) // self.grid_size
-                current_y_grid = current_y // self.grid_size
-                if current_y_grid > target_y_grid:
-                    vertical_change = random.choice([-2, -1, 0]) * self.grid_size
-                else:
-                    vertical_change = random.choice([0, 1, 2]) * self.grid_size
-                current_y += vertical_change
-            
-            # Snap to grid and keep within reasonable bounds
-            current_y_grid = current_y // self.grid_size
-            current_y_grid = max(3, min(SCREEN_HEIGHT // self.grid_size - 3, current_y_grid))
-            current_y = current_y_grid * self.grid_size + self.grid_size // 2
-            
-            current_x_grid = current_x // self.grid_size
-            current_x_grid = max(1, min(SCREEN_WIDTH // self.grid_size - 2, current_x_grid))
-            current_x = current_x_grid * self.grid_size + self.grid_size // 2
-            
-            path_points.append((current_x, current_y))
-        
-        # Final point (castle position) - snap to grid
-        castle_x_grid = (SCREEN_WIDTH - 80) // self.grid_size
-        castle_x = castle_x_grid * self.grid_size + self.grid_size // 2
-        
-        current_y_grid = current_y // self.grid_size
-        castle_y_grid = current_y_grid + random.choice([-1, 0, 1])
-        castle_y_grid = max(4, min(SCREEN_HEIGHT // self.grid_size - 4, castle_y_grid))
-        castle_y = castle_y_grid * self.grid_size + self.grid_size // 2
-        
-        path_points.append((castle_x, castle_y))
-        
-        return path_points
+        self.profiler_font = pygame.font.Font(None, 18)
         
     def create_grid_background(self):
         """Create a grid-style background like the original MSN Kingdom Defender"""
@@ -155,7 +130,7 @@ class Game:
         for y in range(0, SCREEN_HEIGHT, self.grid_size):
             for x in range(0, SCREEN_WIDTH, self.grid_size):
                 # Add slight color variation to each cell
-                variation = random.randint(-5, 5)
+                variation = self.rng.randint(-5, 5)
                 cell_color = (
                     max(0, min(255, base_color[0] + variation)),
                     max(0, min(255, base_color[1] + variation)),
@@ -167,87 +142,120 @@ class Game:
                 pygame.draw.rect(self.background_surface, cell_color, cell_rect)
         
     def start_wave(self):
-        if not self.wave_in_progress:
-            self.wave_enemies.clear()
-            enemies_in_wave = 5 + self.wave * 2
-            
-            # Determine enemy composition based on wave
-            for i in range(enemies_in_wave):
-                if self.wave <= 2:
-                    enemy_type = "goblin"
-                elif self.wave <= 5:
-                    enemy_type = random.choice(["goblin", "orc"])
-                elif self.wave <= 10:
-                    enemy_type = random.choice(["goblin", "orc", "troll"])
-                else:
-                    enemy_type = random.choice(["goblin", "orc", "troll", "dragon"])
-                    
-                self.wave_enemies.append(enemy_type)
-                
-            self.wave_in_progress = True
-            self.wave_complete = False
-            self.enemy_spawn_timer = pygame.time.get_ticks()
-            self.wave_start_time = pygame.time.get_ticks()
-            
-    def spawn_enemy(self):
-        current_time = pygame.time.get_ticks()
-        if (current_time - self.enemy_spawn_timer >= self.enemy_spawn_delay and 
-            len(self.wave_enemies) > 0):
-            
-            enemy_type = self.wave_enemies.pop(0)
-            enemy = Enemy(enemy_type, self.path)
-            self.enemies.append(enemy)
-            self.enemy_spawn_timer = current_time
+        self.sim.start_wave()
+        if self.recorder:
+            self.recorder.start_wave()
+        self.push_snapshot()
+        assets.freeze_heap()  # Quiet moment for the one-off post-loading collection
+            
+    def snapshot_due(self):
+        """Whether a periodic snapshot would hold anything new
+        
+        Nothing changes after game over, and between waves only the player's own
+        actions do, so idle stretches don't push wave-start snapshots out of the ring.
+        """
+        sim = self.sim
+        if sim.game_over:
+            return False
+        if sim.wave_in_progress or sim.enemies or sim.coin_pickups:
+            return True
+        return self.snapshot_state() != self.last_snapshot_state
+    
+    def snapshot_state(self):
+        """What the player can change between waves"""
+        sim = self.sim
+        return (sim.gold, sim.wave, sim.tower_revision, tuple(tower.targeting for tower in sim.towers))
+    
+    def push_snapshot(self):
+        self.snapshots.push(self.ticks, self.sim)
+        self.last_snapshot_state = self.snapshot_state()
+    
+    def next_wave(self):
+        """Start the next wave once the current one is complete; returns whether it started"""
+        if not self.sim.next_wave():
+            return False
+        if self.recorder:
+            self.recorder.next_wave()
+        self.push_snapshot()
+        # Between waves is a quiet moment for the one-off post-loading collection
+        assets.freeze_heap()
+        return True
             
     def update(self):
-        if self.game_over:
-            return
-            
-        current_time = pygame.time.get_ticks()
-        
-        # Spawn enemies if wave is in progress
-        if self.wave_in_progress:
-            self.spawn_enemy()
-            
-        # Update enemies
-        for enemy in self.enemies[:]:
-            result = enemy.update()
-            if result == "reached_end":
-                self.lives -= 1
-                self.enemies.remove(enemy)
-                if self.lives <= 0:
-                    self.game_over = True
-            elif not enemy.alive:
-                # Play enemy death sound effect
-                assets.play_sound('enemy_death')
-                
-                # Create coin pickup effect at enemy position
-                coin_pickup = CoinPickup(enemy.x, enemy.y, enemy.reward)
-                self.coin_pickups.append(coin_pickup)
-                
-                self.gold += enemy.reward
-                self.score += enemy.reward
-                self.enemies.remove(enemy)
-                
-        # Update towers
-        for tower in self.towers:
-            tower.update(self.enemies, current_time)
-            
-        # Update coin pickups
-        for coin_pickup in self.coin_pickups[:]:
-            coin_pickup.update()
-            if not coin_pickup.alive:
-                self.coin_pickups.remove(coin_pickup)
+        self.sim.update()
+        if self.recorder:
+            self.recorder.tick()
+        self.ticks += 1
+        if self.ticks % SNAPSHOT_INTERVAL_TICKS == 0 and self.snapshot_due():
+            self.push_snapshot()
                 
         # Update portal animation
-        self.portal.update()
-            
-        # Check if wave is complete
-        if (self.wave_in_progress and len(self.wave_enemies) == 0 and 
-            len(self.enemies) == 0):
-            self.wave_in_progress = False
-            self.wave_complete = True
-            self.gold += WAVE_COMPLETION_BONUS
+        self.portal.update(self.sim.current_time())
+        
+    def advance(self, elapsed_ms):
+        """Run the fixed simulation steps owed for elapsed real time
+        
+        Returns how far the next frame lies between the last two steps (0-1), for
+        interpolating positions. Fast-forwarding runs `speed` times as many steps and
+        draws only the last of them. After MAX_CATCH_UP_STEPS per unit of speed the
+        remaining backlog is dropped, so a slow frame costs rendering or speed rather
+        than piling up.
+        """
+        self.accumulator += elapsed_ms * self.speed
+        max_steps = MAX_CATCH_UP_STEPS * self.speed
+        advance_clock = getattr(self.sim.tick_source, 'advance', None)
+        steps = 0
+        while self.accumulator >= SIMULATION_STEP_MS:
+            if steps == max_steps:
+                self.accumulator %= SIMULATION_STEP_MS
+                break
+            if advance_clock is not None:
+                advance_clock(SIMULATION_STEP_MS)
+            self.update()
+            self.accumulator -= SIMULATION_STEP_MS
+            steps += 1
+        self.tick_meter.add(steps)
+        return self.accumulator / SIMULATION_STEP_MS
+    
+    def cycle_targeting(self):
+        """Switch the selected tower to its next targeting policy"""
+        self.selected_tower.cycle_targeting()
+        if self.recorder:
+            self.recorder.targeting(self.sim, self.selected_tower)
+    
+    def rollback(self):
+        """Go back to the newest snapshot taken before this step; returns whether there was one
+        
+        Not available while recording, since the recording could no longer be replayed.
+        """
+        if self.recorder:
+            return False
+        tick = self.snapshots.rollback(self.sim, self.ticks)
+        if tick is None:
+            return False
+        self.ticks = tick
+        self.last_snapshot_state = None
+        self.selected_tower = None
+        self.dragging_tower = False
+        self.drag_tower_type = None
+        # The restored path is a new object, so the static layer and overlays rebuild themselves
+        self.portal = Portal(self.sim.path[0][0], self.sim.path[0][1])
+        self.full_redraw_pending = True
+        return True
+    
+    def set_speed(self, speed):
+        """Change the fast-forward multiplier and start measuring tick throughput afresh"""
+        self.speed = speed
+        self.tick_meter = RateMeter(TICK_RATE_WINDOW)
+    
+    def cycle_speed(self):
+        """Switch to the next speed in GAME_SPEEDS, wrapping back to normal speed"""
+        index = GAME_SPEEDS.index(self.speed) if self.speed in GAME_SPEEDS else -1
+        self.set_speed(GAME_SPEEDS[(index + 1) % len(GAME_SPEEDS)])
+    
+    def render_fps_limit(self):
+        """Frame cap for the main loop; fast-forwarding draws less often to leave time for steps"""
+        return MAX_RENDER_FPS if self.speed == 1 else FAST_FORWARD_RENDER_FPS
             
     def handle_mouse_down(self, pos):
         """Handle mouse button down for drag-and-drop"""
@@ -264,7 +272,7 @@ class Game:
             
             if (button_x <= x <= button_x + 100 and 
                 button_y <= y <= button_y + 30 and 
-                self.gold >= cost):
+                self.sim.gold >= cost):
                 # Start dragging tower
                 self.dragging_tower = True
                 self.drag_tower_type = tower_type
@@ -272,27 +280,32 @@ class Game:
                 return
         
         # Check existing tower selection for upgrade
-        for tower in self.towers:
-            if (tower.x - 32 <= x <= tower.x + 32 and 
-                tower.y - 32 <= y <= tower.y + 32):
-                self.selected_tower = tower
-                return
+        tower = self.sim.tower_at(x, y)
+        if tower:
+            self.selected_tower = tower
+            return
                 
+        # Check targeting button
+        if self.selected_tower and self.targeting_button.collidepoint(x, y):
+            self.cycle_targeting()
+            return
+            
+        # Check speed button
+        if self.speed_button.collidepoint(x, y):
+            self.cycle_speed()
+            return
+            
         # Check upgrade button
         if (self.selected_tower and self.selected_tower.level < 3 and
             520 <= x <= 620 and SCREEN_HEIGHT - 80 <= y <= SCREEN_HEIGHT - 50):
-            cost = self.selected_tower.cost * self.selected_tower.level
-            if self.gold >= cost:
-                self.gold -= cost
-                self.selected_tower.upgrade()
+            if self.sim.upgrade_tower(self.selected_tower) and self.recorder:
+                self.recorder.upgrade(self.sim, self.selected_tower)
             return
             
         # Check next wave button
-        if (self.wave_complete and 400 <= x <= 500 and 
+        if (self.sim.wave_complete and 400 <= x <= 500 and 
             SCREEN_HEIGHT - 80 <= y <= SCREEN_HEIGHT - 50):
-            self.wave += 1
-            self.start_wave()
-            self.wave_complete = False
+            self.next_wave()
             return
             
         # Clear tower selection if clicking elsewhere
@@ -301,20 +314,11 @@ class Game:
     def handle_mouse_up(self, pos):
         """Handle mouse button up for drag-and-drop"""
         if self.dragging_tower:
-            x, y = pos
-            
-            # Snap to grid
-            grid_x = (x // self.grid_size) * self.grid_size + self.grid_size // 2
-            grid_y = (y // self.grid_size) * self.grid_size + self.grid_size // 2
-            
-            # Check if position is valid for tower placement
-            if self.can_place_tower(grid_x, grid_y):
-                cost = TOWER_COSTS[self.drag_tower_type]
-                if self.gold >= cost:
-                    # Place the tower
-                    tower = Tower(grid_x, grid_y, self.drag_tower_type)
-                    self.towers.append(tower)
-                    self.gold -= cost
+            # Snap to grid and place the tower if valid and affordable
+            grid_x, grid_y = self.sim.snap_to_grid(*pos)
+            tower = self.sim.place_tower(grid_x, grid_y, self.drag_tower_type)
+            if tower and self.recorder:
+                self.recorder.place(tower)
             
             # Reset drag state
             self.dragging_tower = False
@@ -324,173 +328,248 @@ class Game:
     def handle_mouse_motion(self, pos):
         """Handle mouse motion for drag-and-drop preview"""
         self.mouse_pos = pos
-    
-
-                
-    def can_place_tower(self, x, y):
-        # Check if too close to path
-        for px, py in self.path:
-            if math.sqrt((px - x)**2 + (py - y)**2) < 50:
-                return False
                 
-        # Check if too close to other towers
-        for tower in self.towers:
-            if math.sqrt((tower.x - x)**2 + (tower.y - y)**2) < 50:
-                return False
-                
-        # Check if in UI area
-        if y > SCREEN_HEIGHT - 100:
-            return False
-            
-        return True
-        
-    def draw(self):
+    def build_static_layer(self):
+        """Composite everything that only changes with the map into one surface"""
+        self.static_layer_revision = assets.revision
         # Draw grid background (code-generated)
         if self.background_surface:
-            self.screen.blit(self.background_surface, (0, 0))
+            layer = self.background_surface.copy()
         else:
             # Fallback to solid color if grid creation failed
-            self.screen.fill(DARK_GREEN)
+            layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            layer.fill(DARK_GREEN)
             
-        # Draw portal (enemy spawn point)
-        self.portal.draw(self.screen)
+        self.draw_path(layer)
+        self.draw_castle(layer)
         
-        # Draw blocky path aligned with grid
+        # Match the display format so the per-frame blit is a straight copy
+        try:
+            layer = layer.convert()
+        except pygame.error:
+            pass
+        
+        self.static_layer = layer
+        self.static_layer_path = self.sim.path
+        
+    def static_layer_stale(self):
+        """True when the map changed or background-loaded sprites arrived since the last build"""
+        return (self.static_layer is None or self.static_layer_path is not self.sim.path or
+                self.static_layer_revision != assets.revision)
+        
+    def invalidate_static_layer(self):
+        """Force the static layer to be rebuilt on the next draw"""
+        self.static_layer = None
+        
+    def draw_path(self, surface):
+        """Draw blocky path aligned with grid"""
         path_color = (101, 67, 33)  # Brown color for path blocks
         path_border_color = (80, 52, 25)  # Darker brown for borders
         
-        # Draw path blocks for each segment
-        for i in range(len(self.path) - 1):
-            start_point = self.path[i]
-            end_point = self.path[i + 1]
-            
-            # Get grid positions
-            start_grid_x = start_point[0] // self.grid_size
-            start_grid_y = start_point[1] // self.grid_size
-            end_grid_x = end_point[0] // self.grid_size
-            end_grid_y = end_point[1] // self.grid_size
-            
-            # Draw path blocks between start and end points
-            if start_grid_x == end_grid_x:
-                # Vertical segment
-                min_y = min(start_grid_y, end_grid_y)
-                max_y = max(start_grid_y, end_grid_y)
-                for y in range(min_y, max_y + 1):
-                    grid_x = start_grid_x * self.grid_size
-                    grid_y = y * self.grid_size
-                    path_rect = pygame.Rect(grid_x, grid_y, self.grid_size, self.grid_size)
-                    pygame.draw.rect(self.screen, path_color, path_rect)
-                    pygame.draw.rect(self.screen, path_border_color, path_rect, 2)
-            elif start_grid_y == end_grid_y:
-                # Horizontal segment
-                min_x = min(start_grid_x, end_grid_x)
-                max_x = max(start_grid_x, end_grid_x)
-                for x in range(min_x, max_x + 1):
-                    grid_x = x * self.grid_size
-                    grid_y = start_grid_y * self.grid_size
-                    path_rect = pygame.Rect(grid_x, grid_y, self.grid_size, self.grid_size)
-                    pygame.draw.rect(self.screen, path_color, path_rect)
-                    pygame.draw.rect(self.screen, path_border_color, path_rect, 2)
-            else:
-                # Diagonal segment - draw L-shaped path
-                # First horizontal part
-                min_x = min(start_grid_x, end_grid_x)
-                max_x = max(start_grid_x, end_grid_x)
-                for x in range(min_x, max_x + 1):
-                    grid_x = x * self.grid_size
-                    grid_y = start_grid_y * self.grid_size
-                    path_rect = pygame.Rect(grid_x, grid_y, self.grid_size, self.grid_size)
-                    pygame.draw.rect(self.screen, path_color, path_rect)
-                    pygame.draw.rect(self.screen, path_border_color, path_rect, 2)
-                
-                # Then vertical part
-                min_y = min(start_grid_y, end_grid_y)
-                max_y = max(start_grid_y, end_grid_y)
-                for y in range(min_y, max_y + 1):
-                    grid_x = end_grid_x * self.grid_size
-                    grid_y = y * self.grid_size
-                    path_rect = pygame.Rect(grid_x, grid_y, self.grid_size, self.grid_size)
-                    pygame.draw.rect(self.screen, path_color, path_rect)
-                    pygame.draw.rect(self.screen, path_border_color, path_rect, 2)
-        
-        # Draw castle at the end of the path (what we're defending)
+        # Path tiles, shared with the occupancy grid so what is drawn is what blocks placement
+        for cx, cy in path_tiles(self.sim.path, self.grid_size):
+            path_rect = pygame.Rect(cx * self.grid_size, cy * self.grid_size, self.grid_size, self.grid_size)
+            pygame.draw.rect(surface, path_color, path_rect)
+            pygame.draw.rect(surface, path_border_color, path_rect, 2)
+        
+    def draw_castle(self, surface):
+        """Draw castle at the end of the path (what we're defending)"""
         castle_sprite = assets.get_image('castle')
         if castle_sprite and castle_sprite.get_width() > 0:
-            castle_pos = self.path[-1]  # Last point in the path
+            castle_pos = self.sim.path[-1]  # Last point in the path
             castle_rect = castle_sprite.get_rect()
             castle_rect.center = castle_pos
-            self.screen.blit(castle_sprite, castle_rect)
+            surface.blit(castle_sprite, castle_rect)
         else:
             # Fallback castle drawing
-            castle_x, castle_y = self.path[-1]
-            pygame.draw.rect(self.screen, GRAY, (castle_x - 30, castle_y - 30, 60, 60))
-            pygame.draw.polygon(self.screen, RED, [(castle_x, castle_y - 50), 
+            castle_x, castle_y = self.sim.path[-1]
+            pygame.draw.rect(surface, GRAY, (castle_x - 30, castle_y - 30, 60, 60))
+            pygame.draw.polygon(surface, RED, [(castle_x, castle_y - 50), 
                                                  (castle_x - 20, castle_y - 30), 
                                                  (castle_x + 20, castle_y - 30)])
         
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
+    def build_tower_layer(self):
+        """Static layer with every tower baked in, used to erase sprites in dirty-rect mode"""
+        layer = self.static_layer.copy()
+        for tower in self.sim.towers:
+            tower.queue_body(self.render_queue)
+        self.render_queue.flush(layer)
+        self.tower_layer = layer
+        self.tower_layer_key = (self.static_layer, self.sim.tower_revision)
+        
+    def draw(self, alpha=1.0):
+        """Draw a frame; alpha blends moving sprites between the last two simulation steps"""
+        if self.dirty_rects and not self.sim.game_over:
+            self.draw_dirty(alpha)
+            return
+        mark = profiler.mark
+        profiler.lap()
             
-        # Draw towers
-        for tower in self.towers:
-            tower.draw(self.screen, tower == self.selected_tower)
+        # Background, path and castle come from the cached static layer,
+        # rebuilt only when the map changes
+        if self.static_layer_stale():
+            self.build_static_layer()
+        self.screen.blit(self.static_layer, (0, 0))
             
-        # Draw coin pickups
-        for coin_pickup in self.coin_pickups:
-            coin_pickup.draw(self.screen)
+        # Draw portal (enemy spawn point)
+        self.portal.draw(self.screen)
+        mark('draw.background')
+        
+        # Queue enemies, towers with their shots, and coin pickups, then blit them layer by layer
+        render_queue = self.render_queue
+        current_time = self.sim.current_time()
+        for enemy in self.sim.enemies:
+            enemy.queue_draw(render_queue, current_time, alpha)
+        mark('draw.enemies')
+        for tower in self.sim.towers:
+            tower.queue_draw(render_queue, alpha)
+        mark('draw.towers')
+        for coin_pickup in self.sim.coin_pickups:
+            coin_pickup.queue_draw(render_queue)
+        mark('draw.coins')
+        render_queue.flush(self.screen)
+        if self.selected_tower:
+            self.selected_tower.draw_level_badge(self.screen)
+        mark('draw.blits')
             
         # Draw drag preview
-        if self.dragging_tower and self.drag_tower_type:
-            mouse_x, mouse_y = self.mouse_pos
-            
-            # Snap preview to grid
-            grid_x = (mouse_x // self.grid_size) * self.grid_size + self.grid_size // 2
-            grid_y = (mouse_y // self.grid_size) * self.grid_size + self.grid_size // 2
-            
-            # Check if position is valid
-            is_valid = self.can_place_tower(grid_x, grid_y)
-            
-            # Draw placement preview circle
-            preview_color = GREEN if is_valid else RED
-            pygame.draw.circle(self.screen, preview_color, (grid_x, grid_y), 30, 3)
-            
-            # Draw tower preview (semi-transparent)
-            tower_sprite = assets.get_tower_sprite(self.drag_tower_type, 1)
-            if tower_sprite and tower_sprite.get_width() > 0:
-                # Create semi-transparent version
-                preview_sprite = tower_sprite.copy()
-                preview_sprite.set_alpha(128)  # Semi-transparent
-                
-                # Tint based on validity
-                if not is_valid:
-                    # Add red tint for invalid placement
-                    red_overlay = pygame.Surface(preview_sprite.get_size())
-                    red_overlay.fill(RED)
-                    red_overlay.set_alpha(64)
-                    preview_sprite.blit(red_overlay, (0, 0), special_flags=pygame.BLEND_ADD)
-                
-                sprite_rect = preview_sprite.get_rect()
-                sprite_rect.center = (grid_x, grid_y)
-                self.screen.blit(preview_sprite, sprite_rect)
-            else:
-                # Fallback preview drawing
-                preview_color = (0, 255, 0, 128) if is_valid else (255, 0, 0, 128)
-                pygame.draw.circle(self.screen, preview_color[:3], (grid_x, grid_y), 25)
+        self.draw_drag_preview()
             
         # Draw tower ranges if selected
-        if self.selected_tower:
-            pygame.draw.circle(self.screen, (255, 255, 255, 50), 
-                             (int(self.selected_tower.x), int(self.selected_tower.y)), 
-                             self.selected_tower.range, 2)
+        self.draw_selected_range()
             
         # Draw UI
         self.draw_ui()
         
-        if self.game_over:
+        if self.sim.game_over:
             self.draw_game_over()
+        mark('draw.ui')
+        
+        if profiler.enabled:
+            self.draw_profiler()
+            mark('draw.profiler')
             
         pygame.display.flip()
+        mark('draw.flip')
+        self.full_redraw_pending = True
+        
+    def draw_dirty(self, alpha=1.0):
+        """Redraw only what moved or changed and push just those rectangles to the display"""
+        mark = profiler.mark
+        profiler.lap()
+        if self.static_layer_stale():
+            self.build_static_layer()
+        if self.tower_layer is None or self.tower_layer_key != (self.static_layer, self.sim.tower_revision):
+            self.build_tower_layer()
+            self.full_redraw_pending = True
+        background = self.tower_layer
+        full_redraw = self.full_redraw_pending
+        
+        if full_redraw:
+            self.screen.blit(background, (0, 0))
+        else:
+            # Erase last frame's sprites by restoring the background under them
+            for rect in self.previous_dirty:
+                self.screen.blit(background, rect, rect)
+                
+        # Draw everything that can change from frame to frame
+        dirty = []
+        dirty.append(self.portal.draw(self.screen))
+        mark('draw.background')
+        render_queue = self.render_queue
+        current_time = self.sim.current_time()
+        for enemy in self.sim.enemies:
+            enemy.queue_draw(render_queue, current_time, alpha)
+        mark('draw.enemies')
+        for tower in self.sim.towers:
+            tower.queue_shots(render_queue, alpha)
+        mark('draw.towers')
+        for coin_pickup in self.sim.coin_pickups:
+            coin_pickup.queue_draw(render_queue)
+        mark('draw.coins')
+        render_queue.flush(self.screen, dirty)
+        mark('draw.blits')
+        dirty.append(self.draw_drag_preview())
+        if self.selected_tower:
+            dirty.append(self.selected_tower.draw_level_badge(self.screen))
+        dirty.append(self.draw_selected_range())
+        if profiler.enabled:
+            dirty.append(self.draw_profiler())
+            mark('draw.profiler')
+        screen_rect = self.screen.get_rect()
+        dirty = [rect.clip(screen_rect) for rect in dirty if rect]
+        
+        # The UI band is repainted when its contents change or a sprite touched it
+        updates = self.previous_dirty + dirty
+        ui_state = (self.sim.gold, self.sim.lives, self.sim.wave, self.sim.score,
+                    self.sim.wave_complete, self.selected_tower_type, self.selected_tower,
+                    self.selected_tower.level if self.selected_tower else 0,
+                    self.selected_tower.targeting if self.selected_tower else None,
+                    assets.loading_progress(), self.speed, int(self.tick_meter.rate))
+        if (full_redraw or ui_state != self.ui_state or
+                self.ui_rect.collidelist(updates) != -1):
+            self.draw_ui()
+            self.ui_state = ui_state
+            updates.append(self.ui_rect)
+        mark('draw.ui')
+            
+        self.previous_dirty = dirty
+        self.full_redraw_pending = False
+        
+        # Fall back to a full flip when most of the screen changed anyway
+        dirty_area = sum(rect.width * rect.height for rect in updates)
+        if full_redraw or dirty_area > SCREEN_WIDTH * SCREEN_HEIGHT * DIRTY_RECT_FULL_FLIP_RATIO:
+            pygame.display.flip()
+        else:
+            pygame.display.update(updates)
+        mark('draw.flip')
+        
+    def draw_drag_preview(self):
+        """Draw the tower being dragged, returning the screen area touched"""
+        if not (self.dragging_tower and self.drag_tower_type):
+            return None
+            
+        mouse_x, mouse_y = self.mouse_pos
+        
+        # Snap preview to grid
+        grid_x, grid_y = self.sim.snap_to_grid(mouse_x, mouse_y)
+        
+        # Check if position is valid
+        is_valid = self.sim.can_place_tower(grid_x, grid_y)
+        
+        # Shade buildable cells by how much path they would cover
+        overlay = self.coverage_overlay.surface_for(self.sim, self.drag_tower_type)
+        overlay_rect = self.screen.blit(overlay, (0, 0)) if overlay else None
+        
+        # Draw placement preview circle
+        preview_color = GREEN if is_valid else RED
+        dirty = pygame.draw.circle(self.screen, preview_color, (grid_x, grid_y), 30, 3)
+        if overlay_rect:
+            dirty.union_ip(overlay_rect)
+        
+        # Draw tower preview (semi-transparent)
+        tower_sprite = assets.get_tower_sprite(self.drag_tower_type, 1)
+        if tower_sprite and tower_sprite.get_width() > 0:
+            # Cached semi-transparent version, with a red tint for invalid placement
+            tint = None if is_valid else RED + (64,)
+            preview_sprite = assets.get_derived(assets.tower_sprite_name(self.drag_tower_type), alpha=128, tint=tint)
+            
+            sprite_rect = preview_sprite.get_rect()
+            sprite_rect.center = (grid_x, grid_y)
+            dirty.union_ip(self.screen.blit(preview_sprite, sprite_rect))
+        else:
+            # Fallback preview drawing
+            preview_color = (0, 255, 0, 128) if is_valid else (255, 0, 0, 128)
+            dirty.union_ip(pygame.draw.circle(self.screen, preview_color[:3], (grid_x, grid_y), 25))
+        return dirty
+        
+    def draw_selected_range(self):
+        """Draw the selected tower's range ring, returning the screen area touched"""
+        if not self.selected_tower:
+            return None
+        return pygame.draw.circle(self.screen, (255, 255, 255, 50), 
+                                  (int(self.selected_tower.x), int(self.selected_tower.y)), 
+                                  self.selected_tower.range, 2)
         
     def draw_ui(self):
         # UI background
@@ -522,7 +601,7 @@ class Game:
             self.screen.blit(text, (x + 5, SCREEN_HEIGHT - 75))
             
         # Next wave button
-        if self.wave_complete:
+        if self.sim.wave_complete:
             button_sprite = assets.get_image('button_hover')
             if button_sprite and button_sprite.get_width() > 0:
                 self.screen.blit(button_sprite, (400, SCREEN_HEIGHT - 80))
@@ -544,12 +623,35 @@ class Game:
             text = self.small_font.render(f"Upgrade (${cost})", True, WHITE)
             self.screen.blit(text, (525, SCREEN_HEIGHT - 75))
             
+        # Targeting policy of the selected tower
+        if self.selected_tower:
+            pygame.draw.rect(self.screen, GRAY, self.targeting_button)
+            pygame.draw.rect(self.screen, WHITE, self.targeting_button, 2)
+            text = self.small_font.render(self.selected_tower.targeting.capitalize(), True, WHITE)
+            self.screen.blit(text, (self.targeting_button.x + 5, self.targeting_button.y + 5))
+            
+        # Speed button and the tick rate actually sustained at that speed
+        button_sprite = assets.get_image('button_pressed' if self.speed > 1 else 'button_normal')
+        if button_sprite and button_sprite.get_width() > 0:
+            self.screen.blit(button_sprite, self.speed_button)
+        else:
+            pygame.draw.rect(self.screen, BLUE if self.speed > 1 else GRAY, self.speed_button)
+            pygame.draw.rect(self.screen, WHITE, self.speed_button, 2)
+        text = self.small_font.render(f"Speed {self.speed}x", True, WHITE)
+        self.screen.blit(text, (self.speed_button.x + 5, self.speed_button.y + 5))
+        target_rate = SIMULATION_TICK_RATE * self.speed
+        rate = self.tick_meter.rate
+        rate_text = f"{rate:.0f}" if rate else "--"  # Nothing measured yet at this speed
+        rate_color = RED if 0 < rate < target_rate * 0.95 else GRAY
+        text = self.small_font.render(f"{rate_text}/{target_rate} ticks/s", True, rate_color)
+        self.screen.blit(text, (self.speed_button.x, self.speed_button.bottom + 5))
+            
         # Game stats with icons
         stats_data = [
-            (f"${self.gold}", 'coin_icon'),
-            (f"{self.lives}", 'heart_icon'),
-            (f"Wave {self.wave}", 'wave_icon'),
-            (f"Score: {self.score}", None)
+            (f"${self.sim.gold}", 'coin_icon'),
+            (f"{self.sim.lives}", 'heart_icon'),
+            (f"Wave {self.sim.wave}", 'wave_icon'),
+            (f"Score: {self.sim.score}", None)
         ]
         
         for i, (stat_text, icon_name) in enumerate(stats_data):
@@ -565,6 +667,55 @@ class Game:
             text = self.small_font.render(stat_text, True, WHITE)
             self.screen.blit(text, (x_pos, y_pos))
             
+        # Assets still decoding in the background
+        if not assets.is_ready():
+            progress = int(assets.loading_progress() * 100)
+            text = self.small_font.render(f"Loading assets {progress}%", True, GRAY)
+            self.screen.blit(text, (20, SCREEN_HEIGHT - 40))
+            
+    def draw_profiler(self):
+        """Draw phase timings, frame-time percentiles and a frame-time graph, returning the area touched"""
+        font = self.profiler_font
+        averages = sorted(profiler.phase_averages().items())
+        frame_times = profiler.frame_times()
+        graph_height = 40
+        line_height = 14
+        panel = pygame.Rect(10, 10, 240, 24 + line_height * (len(averages) + 3) + graph_height)
+        
+        overlay = pygame.Surface(panel.size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        self.screen.blit(overlay, panel)
+        
+        y = panel.y + 6
+        lines = [f"frame p50 {profiler.percentile(0.5):.2f}  p95 {profiler.percentile(0.95):.2f}  "
+                 f"p99 {profiler.percentile(0.99):.2f} ms"]
+        if profiler.capture is not None:
+            lines.append(f"capturing profile, {profiler.capture_frames_left} frames left")
+        else:
+            lines.append("F3 hide  F4 capture profile")
+        played, dropped = voices.totals()
+        lines.append(f"voices played {played}  dropped {dropped}")
+        for line in lines:
+            self.screen.blit(font.render(line, True, WHITE), (panel.x + 6, y))
+            y += line_height
+        for name, ms in averages:
+            self.screen.blit(font.render(name, True, WHITE), (panel.x + 6, y))
+            value = font.render(f"{ms:.3f} ms", True, WHITE)
+            self.screen.blit(value, (panel.right - 6 - value.get_width(), y))
+            y += line_height
+            
+        # Rolling frame-time graph, scaled so a 60 FPS frame reaches half height
+        graph = pygame.Rect(panel.x + 6, panel.bottom - graph_height - 6, panel.width - 12, graph_height)
+        budget_y = graph.bottom - graph_height // 2
+        pygame.draw.line(self.screen, GRAY, (graph.x, budget_y), (graph.right, budget_y))
+        if len(frame_times) > 1:
+            step = graph.width / (profiler.history.maxlen - 1)
+            scale = (graph_height / 2) / (1000 / 60)
+            points = [(graph.x + i * step, graph.bottom - min(graph_height, ms * scale))
+                      for i, ms in enumerate(frame_times)]
+            pygame.draw.lines(self.screen, GREEN, False, points)
+        return panel
+            
     def draw_game_over(self):
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         overlay.set_alpha(128)
@@ -572,7 +723,7 @@ class Game:
         self.screen.blit(overlay, (0, 0))
         
         game_over_text = self.font.render("GAME OVER", True, RED)
-        score_text = self.font.render(f"Final Score: {self.score}", True, WHITE)
+        score_text = self.font.render(f"Final Score: {self.sim.score}", True, WHITE)
         restart_text = self.small_font.render("Press R to restart or Q to quit", True, WHITE)
         
         self.screen.blit(game_over_text, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 - 60))
@@ -580,5 +731,10 @@ class Game:
         self.screen.blit(restart_text, (SCREEN_WIDTH//2 - 140, SCREEN_HEIGHT//2 + 20))
         
     def restart(self):
-        # Reinitialize the game with fresh grid background
-        self.__init__()
+        # Reinitialize the game with fresh grid background, keeping the simulation options
+        if self.recorder:
+            self.recorder.save(self.sim)  # The next game records to its own file
+        self.sim.release_pooled()
+        speed = self.speed
+        self.__init__(self.sim.tick_source, self.sim.vectorized, self.dirty_rects, self.sim.seed, self.recorder)
+        self.set_speed(speed)
@@ -1,21 +1,84 @@
 import pygame
 import sys
+import random
+import argparse
+from constants import *
 from game import Game
+from assets import assets
+from profiler import profiler
+from voices import voices
+from replay import Recorder
+
+def seed_value(text):
+    """A --seed that fits the recording header's signed 64-bit field"""
+    seed = int(text)
+    if not -2 ** 63 <= seed < 2 ** 63:
+        raise argparse.ArgumentTypeError("seed must fit in a signed 64-bit integer")
+    return seed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Kingdom Defender")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only push changed screen areas to the display (faster on slow machines)")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="step enemy and projectile movement with NumPy arrays")
+    parser.add_argument("--speed", type=int, choices=GAME_SPEEDS, default=1,
+                        help="start fast-forwarded at this multiplier (Tab cycles speeds)")
+    parser.add_argument("--seed", type=seed_value, default=None,
+                        help="seed the path and waves so a game can be played again")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the seed and every input to PATH, for replay.py "
+                             "(games after a restart go to PATH-2, PATH-3, ...)")
+    parser.add_argument("--show-profiler", action="store_true",
+                        help="start with the frame profiler overlay visible (toggle with F3)")
+    parser.add_argument("--profile", type=int, default=0, metavar="FRAMES",
+                        help="record a cProfile of the first FRAMES frames (F4 captures later ones)")
+    parser.add_argument("--sound-stats", action="store_true",
+                        help="print how many voices each sound played and dropped on exit")
+    parser.add_argument("--profile-out", default="kingdom_defender.prof", metavar="PATH",
+                        help="where profile captures are written (default kingdom_defender.prof)")
+    return parser.parse_args()
+
+def quit_game(args, game):
+    if game.recorder:
+        game.recorder.save(game.sim)
+        for path in game.recorder.saved:
+            print(f"Recording written to {path}")
+    pygame.quit()
+    if args.sound_stats:
+        for line in voices.report():
+            print(line)
+    sys.exit()
 
 def main():
-    # Initialize Pygame
+    args = parse_args()
+    
+    # Initialize the mixer first so our audio settings take effect, then Pygame
+    assets.init_mixer()
     pygame.init()
     
     # Create and run the game
-    game = Game()
+    seed = args.seed
+    recorder = None
+    if args.record:
+        recorder = Recorder(args.record)
+        if seed is None:
+            seed = random.randrange(2 ** 63)  # Replays need a known seed
+    game = Game(vectorized=args.vectorized, dirty_rects=args.dirty_rects, seed=seed, recorder=recorder)
+    game.set_speed(args.speed)
     game.start_wave()
     
+    profiler.set_enabled(args.show_profiler)
+    capture_frames = args.profile or PROFILE_CAPTURE_FRAMES
+    if args.profile:
+        profiler.start_capture(args.profile, args.profile_out)
+    
     # Main game loop
     while True:
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game(args, game)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     game.handle_mouse_down(event.pos)
@@ -25,17 +88,28 @@ def main():
             elif event.type == pygame.MOUSEMOTION:
                 game.handle_mouse_motion(event.pos)
             elif event.type == pygame.KEYDOWN:
-                if game.game_over:
+                if event.key == pygame.K_F3:
+                    profiler.set_enabled(not profiler.enabled)
+                elif event.key == pygame.K_F4:
+                    profiler.start_capture(capture_frames, args.profile_out)
+                elif event.key == pygame.K_TAB:
+                    game.cycle_speed()
+                elif event.key == pygame.K_t and game.selected_tower:
+                    game.cycle_targeting()
+                elif event.key == pygame.K_F9:
+                    game.rollback()
+                elif game.sim.game_over:
                     if event.key == pygame.K_r:
                         game.restart()
                         game.start_wave()
                     elif event.key == pygame.K_q:
-                        pygame.quit()
-                        sys.exit()
+                        quit_game(args, game)
                         
-        game.update()
-        game.draw()
-        game.clock.tick(60)  # 60 FPS
+        # Simulation runs in fixed steps; frames are drawn as often as the machine allows,
+        # and only once per batch of steps when fast-forwarding
+        alpha = game.advance(game.clock.tick(game.render_fps_limit()))
+        game.draw(alpha)
+        profiler.end_frame()
 
 if __name__ == "__main__":
     main()
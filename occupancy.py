@@ -0,0 +1,95 @@
+from constants import *
+
+# What a grid cell holds
+CELL_FREE = 0
+CELL_PATH = 1
+CELL_TOWER = 2
+CELL_UI = 3
+
+def path_tiles(path, cell_size):
+    """Grid cells covered by the blocky path, in drawing order
+
+    Straight segments cover the cells between their ends; diagonal segments are drawn
+    as an L, first along the start row, then down the end column. Corner cells are
+    repeated where segments meet.
+    """
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        start_cx, start_cy = int(x1 // cell_size), int(y1 // cell_size)
+        end_cx, end_cy = int(x2 // cell_size), int(y2 // cell_size)
+        if start_cx == end_cx:
+            for cy in range(min(start_cy, end_cy), max(start_cy, end_cy) + 1):
+                yield start_cx, cy
+        elif start_cy == end_cy:
+            for cx in range(min(start_cx, end_cx), max(start_cx, end_cx) + 1):
+                yield cx, start_cy
+        else:
+            for cx in range(min(start_cx, end_cx), max(start_cx, end_cx) + 1):
+                yield cx, start_cy
+            for cy in range(min(start_cy, end_cy), max(start_cy, end_cy) + 1):
+                yield end_cx, cy
+
+class OccupancyGrid:
+    """Per-cell record of path tiles, towers and the UI band, for placement and picking"""
+
+    TOWER_HALF_SIZE = 32  # Towers are picked anywhere within their sprite's box
+
+    def __init__(self, cell_size, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, ui_top=SCREEN_HEIGHT - 100):
+        self.cell_size = cell_size
+        self.columns = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        self.cells = bytearray(self.columns * self.rows)
+        self.towers = {}  # (cx, cy) -> (placement order, tower)
+        self.towers_placed = 0
+
+        # Rows reaching into the UI band are never buildable
+        for cy in range(self.rows):
+            if (cy + 1) * cell_size > ui_top:
+                for cx in range(self.columns):
+                    self.cells[cy * self.columns + cx] = CELL_UI
+
+    def cell_of(self, x, y):
+        """Grid cell coordinates containing a position"""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def get(self, cx, cy):
+        """Contents of a cell; cells off the map count as UI"""
+        if 0 <= cx < self.columns and 0 <= cy < self.rows:
+            return self.cells[cy * self.columns + cx]
+        return CELL_UI
+
+    def mark_path(self, path):
+        for cx, cy in path_tiles(path, self.cell_size):
+            if 0 <= cx < self.columns and 0 <= cy < self.rows:
+                self.cells[cy * self.columns + cx] = CELL_PATH
+
+    def add_tower(self, tower):
+        cx, cy = self.cell_of(tower.x, tower.y)
+        if 0 <= cx < self.columns and 0 <= cy < self.rows:
+            self.cells[cy * self.columns + cx] = CELL_TOWER
+        self.towers.setdefault((cx, cy), (self.towers_placed, tower))
+        self.towers_placed += 1
+
+    def can_place(self, x, y):
+        """Whether a tower fits in the cell at (x, y): free, and no tower in a side-adjacent cell"""
+        cx, cy = self.cell_of(x, y)
+        if self.get(cx, cy) != CELL_FREE:
+            return False
+        return (self.get(cx - 1, cy) != CELL_TOWER and self.get(cx + 1, cy) != CELL_TOWER and
+                self.get(cx, cy - 1) != CELL_TOWER and self.get(cx, cy + 1) != CELL_TOWER)
+
+    def tower_at(self, x, y):
+        """Tower whose box covers (x, y), the earliest placed if boxes overlap"""
+        half = self.TOWER_HALF_SIZE
+        min_cx, min_cy = self.cell_of(x - half, y - half)
+        max_cx, max_cy = self.cell_of(x + half, y + half)
+        best = None
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                entry = self.towers.get((cx, cy))
+                if entry is None:
+                    continue
+                tower = entry[1]
+                if abs(tower.x - x) <= half and abs(tower.y - y) <= half:
+                    if best is None or entry[0] < best[0]:
+                        best = entry
+        return best[1] if best else None
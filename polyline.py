@@ -0,0 +1,72 @@
+import math
+from bisect import bisect_left
+
+class Polyline(tuple):
+    """Immutable sequence of path points, precomputed for arc-length lookups
+
+    cumulative[i] is the distance along the path to point i, and unit_x/unit_y give
+    the direction of the segment starting at point i. Anything moving along the path
+    only needs its distance travelled; its position is a lookup away.
+    """
+
+    def __new__(cls, points):
+        line = super().__new__(cls, (tuple(point) for point in points))
+        cumulative = [0.0]
+        unit_x = []
+        unit_y = []
+        for (x1, y1), (x2, y2) in zip(line, line[1:]):
+            length = math.hypot(x2 - x1, y2 - y1)
+            cumulative.append(cumulative[-1] + length)
+            unit_x.append((x2 - x1) / length if length else 0.0)
+            unit_y.append((y2 - y1) / length if length else 0.0)
+        line.cumulative = cumulative
+        line.unit_x = unit_x
+        line.unit_y = unit_y
+        line.total_length = cumulative[-1]
+        return line
+
+    def segment_at(self, distance, segment=0):
+        """Index of the segment containing distance, searching forward from a known segment"""
+        cumulative = self.cumulative
+        last = len(self) - 2
+        while segment < last and distance > cumulative[segment + 1]:
+            segment += 1
+        return segment
+
+    def point_on_segment(self, segment, distance):
+        """Position at distance along the path, given the segment that contains it"""
+        x, y = self[segment]
+        offset = distance - self.cumulative[segment]
+        return x + self.unit_x[segment] * offset, y + self.unit_y[segment] * offset
+
+    def position_at(self, distance):
+        """Position at any distance along the path, clamped to its ends"""
+        distance = max(0.0, min(self.total_length, distance))
+        segment = max(0, min(len(self) - 2, bisect_left(self.cumulative, distance) - 1))
+        return self.point_on_segment(segment, distance)
+
+    def intervals_within(self, x, y, radius):
+        """Merged (start, end) distance ranges along the path lying within radius of (x, y)"""
+        intervals = []
+        radius_sq = radius * radius
+        for segment, (px, py) in enumerate(self[:-1]):
+            # Solve |p + t*u - c|^2 <= r^2 for t along the segment
+            ox = px - x
+            oy = py - y
+            b = self.unit_x[segment] * ox + self.unit_y[segment] * oy
+            discriminant = b * b - (ox * ox + oy * oy - radius_sq)
+            if discriminant < 0:
+                continue
+            root = math.sqrt(discriminant)
+            length = self.cumulative[segment + 1] - self.cumulative[segment]
+            start = max(0.0, -b - root)
+            end = min(length, -b + root)
+            if start > end:
+                continue
+            start += self.cumulative[segment]
+            end += self.cumulative[segment]
+            if intervals and start <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+            else:
+                intervals.append((start, end))
+        return intervals
@@ -0,0 +1,88 @@
+class ObjectPool:
+    """Free list of reusable instances of one class, re-initialized on acquire"""
+
+    def __init__(self, cls, max_free=1024):
+        self.cls = cls
+        self.max_free = max_free
+        self.free = []
+        self.next_generation = 1
+
+        # Statistics
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.discarded = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def acquire(self, *args, **kwargs):
+        """Return an initialized instance, recycling a released one when possible"""
+        if self.free:
+            obj = self.free.pop()
+            self.reused += 1
+        else:
+            obj = self.cls.__new__(self.cls)
+            self.created += 1
+        obj.__init__(*args, **kwargs)
+        # Generation lets holders of old references notice the object was recycled
+        obj.pool_generation = self.next_generation
+        self.next_generation += 1
+        self.in_use += 1
+        if self.in_use > self.peak_in_use:
+            self.peak_in_use = self.in_use
+        return obj
+
+    def release(self, obj):
+        """Hand an instance back; it must not be used again by the caller"""
+        self.in_use -= 1
+        self.released += 1
+        if len(self.free) < self.max_free:
+            self.free.append(obj)
+        else:
+            self.discarded += 1
+
+    def stats(self):
+        """Pool size and churn counters"""
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released,
+            'discarded': self.discarded,
+            'in_use': self.in_use,
+            'peak_in_use': self.peak_in_use,
+            'free': len(self.free),
+        }
+
+class PoolRegistry:
+    """One ObjectPool per class, shared by the whole game"""
+
+    def __init__(self):
+        self.pools = {}
+
+    def pool_for(self, cls):
+        pool = self.pools.get(cls)
+        if pool is None:
+            pool = ObjectPool(cls)
+            self.pools[cls] = pool
+        return pool
+
+    def acquire(self, cls, *args, **kwargs):
+        """Get a pooled instance of cls initialized with the given arguments"""
+        return self.pool_for(cls).acquire(*args, **kwargs)
+
+    def release(self, obj):
+        """Return an instance obtained from acquire to its class's pool"""
+        # Objects constructed directly, or already released, are left to the GC
+        if not getattr(obj, 'pool_generation', 0):
+            return
+        pool = self.pools.get(type(obj))
+        if pool is not None:
+            obj.pool_generation = 0
+            pool.release(obj)
+
+    def stats(self):
+        """Statistics for every pool, keyed by class name"""
+        return {cls.__name__: pool.stats() for cls, pool in self.pools.items()}
+
+# Global pool registry instance
+pools = PoolRegistry()
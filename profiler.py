@@ -0,0 +1,115 @@
+import math
+import time
+import cProfile
+from collections import deque
+
+class FrameProfiler:
+    """Per-phase frame timings with a rolling history, plus on-demand cProfile capture
+
+    Code under measurement calls lap() at the start of a section and mark(name) after
+    each phase; the time since the previous lap or mark is charged to that phase. While
+    the profiler is disabled both return immediately.
+    """
+
+    def __init__(self, history=240):
+        self.enabled = False
+        self.history = deque(maxlen=history)  # (frame ms, {phase: ms}) for recent frames
+        self.phases = {}
+        self.frame_start = 0.0
+        self.last = 0.0
+
+        # cProfile capture of the next few frames
+        self.capture = None
+        self.capture_path = None
+        self.capture_frames_left = 0
+
+    def set_enabled(self, enabled):
+        """Turn phase timing on or off, dropping any history"""
+        self.enabled = enabled
+        self.history.clear()
+        self.phases = {}
+
+    def begin_frame(self):
+        if self.enabled:
+            self.phases = {}
+            self.frame_start = self.last = time.perf_counter()
+
+    def lap(self):
+        """Start timing a new section without charging the gap to any phase"""
+        if self.enabled:
+            self.last = time.perf_counter()
+
+    def mark(self, name):
+        """Charge the time since the last lap or mark to the named phase"""
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases[name] = self.phases.get(name, 0.0) + (now - self.last) * 1000
+            self.last = now
+
+    def end_frame(self):
+        if self.enabled:
+            frame_ms = (time.perf_counter() - self.frame_start) * 1000
+            self.history.append((frame_ms, self.phases))
+        if self.capture is not None:
+            self.capture_frames_left -= 1
+            if self.capture_frames_left <= 0:
+                self.stop_capture()
+
+    def start_capture(self, frames, path):
+        """Record a cProfile of the next `frames` frames into `path`"""
+        if self.capture is not None:
+            return False
+        self.capture = cProfile.Profile()
+        self.capture_path = path
+        self.capture_frames_left = frames
+        self.capture.enable()
+        return True
+
+    def stop_capture(self):
+        self.capture.disable()
+        self.capture.dump_stats(self.capture_path)
+        print(f"Profile written to {self.capture_path}")
+        self.capture = None
+
+    def frame_times(self):
+        """Frame times (ms) of the recent history, oldest first"""
+        return [frame_ms for frame_ms, _ in self.history]
+
+    def percentile(self, fraction):
+        """Nearest-rank percentile of recent frame times"""
+        ordered = sorted(self.frame_times())
+        if not ordered:
+            return 0.0
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+    def phase_averages(self):
+        """Mean milliseconds per frame for every phase seen in the recent history"""
+        totals = {}
+        for _, phases in self.history:
+            for name, ms in phases.items():
+                totals[name] = totals.get(name, 0.0) + ms
+        frames = max(1, len(self.history))
+        return {name: total / frames for name, total in totals.items()}
+
+class RateMeter:
+    """Events per second of wall time, re-measured at the end of every window"""
+
+    def __init__(self, window=1.0):
+        self.window = window
+        self.rate = 0.0
+        self.reset()
+
+    def reset(self):
+        """Start a fresh window, keeping the last measured rate until it completes"""
+        self.count = 0
+        self.window_start = time.perf_counter()
+
+    def add(self, count):
+        self.count += count
+        elapsed = time.perf_counter() - self.window_start
+        if elapsed >= self.window:
+            self.rate = self.count / elapsed
+            self.reset()
+
+# Global profiler instance
+profiler = FrameProfiler()
@@ -0,0 +1,89 @@
+from bisect import bisect_left, bisect_right
+
+class ProgressIndex:
+    """Live enemies ordered by distance travelled along the path, for tower targeting
+
+    Each tower's range maps to the stretches of path it covers, so choosing the first,
+    last, strongest or weakest enemy in range is a range query over the ordering rather
+    than a scan of every enemy. The ordering is refreshed at most once per tick, and
+    only when some tower asks for it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.enemies = []
+        self.order = []      # Live enemies, least progress first
+        self.distances = []  # Their distances along the path, for bisecting
+        self.stale = True
+        self.intervals = {}  # tower -> (range, covered path intervals)
+
+    def rebuild(self, enemies):
+        """Note this tick's enemies; the ordering is redone on the next query"""
+        self.enemies = enemies
+        self.stale = True
+
+    def refresh(self):
+        # Spawn order is nearly reverse path order (overtaking aside), so the sort
+        # sees a few long runs and costs little more than a pass over the list
+        self.order = sorted((enemy for enemy in reversed(self.enemies) if enemy.alive),
+                            key=lambda enemy: enemy.distance)
+        self.distances = [enemy.distance for enemy in self.order]
+        self.stale = False
+
+    def intervals_for(self, tower):
+        """Path distance intervals within the tower's range, recomputed after upgrades"""
+        cached = self.intervals.get(tower)
+        if cached is None or cached[0] != tower.range:
+            cached = self.intervals[tower] = (tower.range, self.path.intervals_within(tower.x, tower.y, tower.range))
+        return cached[1]
+
+    def candidates(self, tower):
+        """Enemies on the path within the tower's range, in increasing path order"""
+        if self.stale:
+            self.refresh()
+        distances = self.distances
+        order = self.order
+        x, y = tower.x, tower.y
+        radius_sq = tower.range * tower.range
+        for start, end in self.intervals_for(tower):
+            for i in range(bisect_left(distances, start), bisect_right(distances, end)):
+                enemy = order[i]
+                # Towers earlier in the tick may have killed it; the distance check
+                # guards interval edges against rounding
+                if enemy.alive and (enemy.x - x)**2 + (enemy.y - y)**2 <= radius_sq:
+                    yield enemy
+
+    def first(self, tower):
+        """In-range enemy furthest along the path"""
+        if self.stale:
+            self.refresh()
+        distances = self.distances
+        order = self.order
+        x, y = tower.x, tower.y
+        radius_sq = tower.range * tower.range
+        for start, end in reversed(self.intervals_for(tower)):
+            for i in range(bisect_right(distances, end) - 1, bisect_left(distances, start) - 1, -1):
+                enemy = order[i]
+                if enemy.alive and (enemy.x - x)**2 + (enemy.y - y)**2 <= radius_sq:
+                    return enemy
+        return None
+
+    def last(self, tower):
+        """In-range enemy least far along the path"""
+        return next(self.candidates(tower), None)
+
+    def strongest(self, tower):
+        """In-range enemy with the most health, the furthest along on ties"""
+        best = None
+        for enemy in self.candidates(tower):
+            if best is None or enemy.health >= best.health:
+                best = enemy
+        return best
+
+    def weakest(self, tower):
+        """In-range enemy with the least health, the furthest along on ties"""
+        best = None
+        for enemy in self.candidates(tower):
+            if best is None or enemy.health <= best.health:
+                best = enemy
+        return best
@@ -3,12 +3,22 @@ import math
 from constants import *
 from assets import assets
 from explosion import VisualEffect
+from pool import pools
+from entity_types import TOWER_TYPES
 
 class Projectile:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'target', 'target_generation', 'damage', 'color',
+                 'speed', 'tower_type', 'active', 'angle', 'pool_generation')
+    
     def __init__(self, x, y, target, damage, color, speed, tower_type="archer"):
+        self.pool_generation = 0  # Set by the object pool on every acquire
         self.x = x
         self.y = y
+        self.prev_x = x  # Position at the previous tick, for render interpolation
+        self.prev_y = y
         self.target = target
+        # Remember which incarnation of a pooled enemy we are chasing
+        self.target_generation = target.pool_generation
         self.damage = damage
         self.color = color
         self.speed = speed
@@ -17,29 +27,21 @@ class Projectile:
         self.angle = 0
         
     def update(self, enemies):
-        if not self.active or not self.target.alive:
+        if (not self.active or not self.target.alive or
+            self.target.pool_generation != self.target_generation):
             self.active = False
             return False, None
             
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Move towards target
         dx = self.target.x - self.x
         dy = self.target.y - self.y
         distance = math.sqrt(dx*dx + dy*dy)
         
         if distance < 5:  # Hit target
-            # Create appropriate visual effect based on tower type
-            effect = None
-            if self.tower_type == "cannon":
-                effect = VisualEffect(self.target.x, self.target.y, "explosion")
-            elif self.tower_type == "magic":
-                effect = VisualEffect(self.target.x, self.target.y, "sparkle")
-            # archer tower gets no effect (effect stays None)
-            
-            if self.target.take_damage(self.damage):
-                self.active = False
-                return True, effect  # Enemy died
-            self.active = False
-            return False, effect  # Hit but enemy still alive
+            return self.hit()
         else:
             self.x += (dx / distance) * self.speed
             self.y += (dy / distance) * self.speed
@@ -48,17 +50,32 @@ class Projectile:
             
         return False, None
         
-    def draw(self, screen):
+    def hit(self):
+        """Apply damage to the target and return (killed, effect)"""
+        # Create appropriate visual effect based on tower type
+        effect = None
+        effect_type = TOWER_TYPES[self.tower_type].impact_effect
+        if effect_type:  # Archer towers have no impact effect
+            effect = pools.acquire(VisualEffect, self.target.x, self.target.y, effect_type)
+        
+        if self.target.take_damage(self.damage):
+            self.active = False
+            return True, effect  # Enemy died
+        self.active = False
+        return False, effect  # Hit but enemy still alive
+        
+    def queue_draw(self, render_queue, alpha=1.0):
+        """Queue the projectile for drawing"""
         if self.active:
+            x = self.prev_x + (self.x - self.prev_x) * alpha
+            y = self.prev_y + (self.y - self.prev_y) * alpha
             # Try to get sprite from assets
             sprite = assets.get_projectile_sprite(self.tower_type)
             
             if sprite and sprite.get_width() > 0:  # Valid sprite loaded
-                # Rotate sprite to face movement direction
-                rotated_sprite = pygame.transform.rotate(sprite, -self.angle)
-                sprite_rect = rotated_sprite.get_rect()
-                sprite_rect.center = (int(self.x), int(self.y))
-                screen.blit(rotated_sprite, sprite_rect)
+                # Rotate sprite to face movement direction (cached per angle step)
+                sprite = assets.get_derived(assets.projectile_sprite_name(self.tower_type), -self.angle)
             else:
                 # Fallback to colored circle
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 3)
+                sprite = render_queue.circle(self.color, 3)
+            render_queue.add_centered('projectiles', sprite, int(x), int(y))
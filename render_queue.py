@@ -0,0 +1,90 @@
+import pygame
+from constants import *
+
+# Draw order of the sprite layers, bottom to top
+RENDER_LAYERS = ('enemies', 'health_bars', 'towers', 'projectiles', 'effects', 'coins')
+
+HEALTH_BAR_HEIGHT = 4
+
+class RenderQueue:
+    """Sprites collected per layer over a frame, then drawn with one Surface.blits call per layer
+
+    Entities queue (surface, position) pairs instead of blitting one at a time. Shapes
+    and text that used to be drawn per object every frame (health bars, fallback
+    circles, labels) come from small caches of pre-rendered surfaces, so everything
+    goes through the same batched blit.
+    """
+
+    def __init__(self):
+        self.layers = {layer: [] for layer in RENDER_LAYERS}
+        self.health_bars = {}  # (width, filled width) -> bar surface
+        self.circles = {}      # (color, radius, border color, border width) -> circle surface
+        self.texts = {}        # (text, font size, color, alpha) -> rendered text
+        self.fonts = {}        # font size -> Font
+
+    def add(self, layer, surface, position):
+        """Queue a surface with its top-left corner at position"""
+        self.layers[layer].append((surface, position))
+
+    def add_centered(self, layer, surface, x, y):
+        """Queue a surface centered on (x, y), matching Rect.center placement"""
+        self.layers[layer].append((surface, (x - surface.get_width() // 2, y - surface.get_height() // 2)))
+
+    def health_bar(self, width, ratio):
+        """Red bar of the given width with the health fraction filled in green"""
+        filled = max(0, min(width, int(width * ratio)))
+        key = (width, filled)
+        bar = self.health_bars.get(key)
+        if bar is None:
+            bar = pygame.Surface((width, HEALTH_BAR_HEIGHT))
+            bar.fill(RED)
+            if filled:
+                bar.fill(GREEN, (0, 0, filled, HEALTH_BAR_HEIGHT))
+            self.health_bars[key] = bar
+        return bar
+
+    def circle(self, color, radius, border_color=None, border=0):
+        """Filled circle, optionally outlined, on a transparent square of side 2 * radius"""
+        key = (color, radius, border_color, border)
+        surface = self.circles.get(key)
+        if surface is None:
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            if border_color is not None:
+                pygame.draw.circle(surface, border_color, (radius, radius), radius, border)
+            self.circles[key] = surface
+        return surface
+
+    def text(self, text, size, color, alpha=255):
+        """Rendered label, faded to alpha (quantized like derived sprites)"""
+        if alpha < 255:
+            alpha = max(0, min(255, round(alpha / DERIVED_ALPHA_STEP) * DERIVED_ALPHA_STEP))
+        key = (text, size, color, alpha)
+        surface = self.texts.get(key)
+        if surface is None:
+            font = self.fonts.get(size)
+            if font is None:
+                font = self.fonts[size] = pygame.font.Font(None, size)
+            surface = font.render(text, True, color)
+            if alpha < 255:
+                surface.set_alpha(alpha)
+            self.texts[key] = surface
+        return surface
+
+    def flush(self, screen, dirty=None):
+        """Blit every queued layer in order and empty the queue
+
+        With a dirty list, the screen areas touched are appended to it.
+        """
+        for layer in RENDER_LAYERS:
+            items = self.layers[layer]
+            if items:
+                if dirty is None:
+                    screen.blits(items, False)
+                else:
+                    dirty.extend(screen.blits(items))
+                items.clear()
+
+    def clear(self):
+        for items in self.layers.values():
+            items.clear()
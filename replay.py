@@ -0,0 +1,226 @@
+import os
+import sys
+import time
+import zlib
+import struct
+import argparse
+import statistics
+from constants import *
+from simulation import Simulation, ManualClock
+from tower import TARGETING_POLICIES
+from assets import assets
+
+REPLAY_MAGIC = b'KDRP'
+REPLAY_VERSION = 1
+HEADER = struct.Struct('<4sHqdB')      # magic, version, seed, clock start (ms), tower type count
+EVENT = struct.Struct('<IBBhh')        # tick, kind, arg, x, y
+FOOTER = struct.Struct('<IIqiqiII')    # event count, final tick, gold, lives, score, wave, enemies, digest
+
+# Event kinds. PLACE carries a tower type id in arg; UPGRADE and TARGET carry a tower
+# index (placement order) in x, TARGET its new policy id in arg.
+EVENT_START_WAVE = 0
+EVENT_PLACE = 1
+EVENT_UPGRADE = 2
+EVENT_NEXT_WAVE = 3
+EVENT_TARGET = 4
+
+class ReplayError(Exception):
+    pass
+
+def state_digest(sim):
+    """CRC of everything that should match between a game and its replay"""
+    packed = bytearray()
+    for enemy in sim.enemies:
+        packed += struct.pack('<ddd?', enemy.distance, enemy.x, enemy.health, enemy.alive)
+    for tower in sim.towers:
+        packed += struct.pack('<ddBd', tower.x, tower.y, tower.level, tower.last_shot)
+    packed += struct.pack('<qiqiI', sim.gold, sim.lives, sim.score, sim.wave, len(sim.wave_enemies))
+    return zlib.crc32(packed)
+
+class Recording:
+    """Seed, starting clock and tick-tagged inputs of one game, plus its final state"""
+
+    def __init__(self, seed, clock_start=0.0, tower_types=()):
+        self.seed = seed
+        self.clock_start = clock_start
+        self.tower_types = list(tower_types)  # Type names, indexed by PLACE events
+        self.events = []  # (tick, kind, arg, x, y)
+        self.final_tick = 0
+        self.final_state = None  # (gold, lives, score, wave, enemies, digest)
+
+    def final_state_of(self, sim):
+        return (sim.gold, sim.lives, sim.score, sim.wave, len(sim.enemies), state_digest(sim))
+
+    def save(self, path):
+        with open(path, 'wb') as out:
+            out.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.clock_start, len(self.tower_types)))
+            for name in self.tower_types:
+                encoded = name.encode('utf-8')
+                out.write(struct.pack('<B', len(encoded)) + encoded)
+            for event in self.events:
+                out.write(EVENT.pack(*event))
+            out.write(FOOTER.pack(len(self.events), self.final_tick, *self.final_state))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as source:
+            data = source.read()
+        try:
+            magic, version, seed, clock_start, type_count = HEADER.unpack_from(data, 0)
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ReplayError(f"{path} is not a version {REPLAY_VERSION} replay")
+            offset = HEADER.size
+            tower_types = []
+            for _ in range(type_count):
+                length = data[offset]
+                tower_types.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+                offset += 1 + length
+            footer = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+            recording = cls(seed, clock_start, tower_types)
+            recording.events = list(EVENT.iter_unpack(data[offset:offset + footer[0] * EVENT.size]))
+        except (struct.error, IndexError, UnicodeDecodeError):
+            raise ReplayError(f"{path} is truncated or corrupt")
+        recording.final_tick = footer[1]
+        recording.final_state = footer[2:]
+        return recording
+
+class Recorder:
+    """Collects a game's inputs as they are applied, tagged with the simulation tick
+
+    The first game is written to the given path and each restarted game to its own
+    numbered file beside it (game.kdr, game-2.kdr, ...), so no recording replaces another.
+    """
+
+    def __init__(self, path):
+        self.base_path = path
+        self.path = path
+        self.games = 0
+        self.saved = []  # Paths written so far
+        self.recording = None
+        self.ticks = 0
+
+    def begin(self, sim):
+        """Start a fresh recording of a newly created simulation"""
+        self.games += 1
+        if self.games > 1:
+            stem, extension = os.path.splitext(self.base_path)
+            self.path = f"{stem}-{self.games}{extension}"
+        self.recording = Recording(sim.seed, sim.current_time())
+        self.ticks = 0
+
+    def tick(self):
+        self.ticks += 1
+
+    def add(self, kind, arg=0, x=0, y=0):
+        self.recording.events.append((self.ticks, kind, arg, x, y))
+
+    def start_wave(self):
+        self.add(EVENT_START_WAVE)
+
+    def place(self, tower):
+        types = self.recording.tower_types
+        if tower.tower_type not in types:
+            types.append(tower.tower_type)
+        self.add(EVENT_PLACE, types.index(tower.tower_type), tower.x, tower.y)
+
+    def upgrade(self, sim, tower):
+        self.add(EVENT_UPGRADE, 0, sim.towers.index(tower))
+
+    def next_wave(self):
+        self.add(EVENT_NEXT_WAVE)
+
+    def targeting(self, sim, tower):
+        self.add(EVENT_TARGET, TARGETING_POLICIES.index(tower.targeting), sim.towers.index(tower))
+
+    def save(self, sim):
+        """Write the recording so far, ending at the current tick and state"""
+        recording = self.recording
+        recording.final_tick = self.ticks
+        recording.final_state = recording.final_state_of(sim)
+        recording.save(self.path)
+        if self.path not in self.saved:
+            self.saved.append(self.path)
+
+def apply_event(sim, recording, event):
+    """Re-apply one recorded input; returns False if it no longer succeeds"""
+    _, kind, arg, x, y = event
+    if kind == EVENT_START_WAVE:
+        sim.start_wave()
+        return True
+    if kind == EVENT_PLACE:
+        return sim.place_tower(x, y, recording.tower_types[arg]) is not None
+    if kind == EVENT_NEXT_WAVE:
+        return sim.next_wave()
+    if not 0 <= x < len(sim.towers):
+        return False
+    tower = sim.towers[x]
+    if kind == EVENT_UPGRADE:
+        return sim.upgrade_tower(tower)
+    if kind == EVENT_TARGET:
+        tower.targeting = TARGETING_POLICIES[arg]
+        return True
+    raise ReplayError(f"unknown event kind {kind}")
+
+def replay(recording, vectorized=False):
+    """Re-run a recording headless as fast as possible
+
+    Returns (final state, seconds spent stepping, list of inputs that failed).
+    """
+    clock = ManualClock(recording.clock_start)
+    sim = Simulation(clock, vectorized, recording.seed)
+    events = recording.events
+    next_event = 0
+    failed = []
+    start = time.perf_counter()
+    for tick in range(recording.final_tick + 1):
+        # Inputs tagged with a tick were applied after that many steps had run
+        while next_event < len(events) and events[next_event][0] == tick:
+            if not apply_event(sim, recording, events[next_event]):
+                failed.append(events[next_event])
+            next_event += 1
+        if tick == recording.final_tick:
+            break
+        clock.advance(SIMULATION_STEP_MS)
+        sim.update()
+    elapsed = time.perf_counter() - start
+    final_state = recording.final_state_of(sim)
+    sim.release_pooled()
+    return final_state, elapsed, failed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a recorded Kingdom Defender game headless and verify it")
+    parser.add_argument("replay", help="replay file written by main.py --record")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="step enemy and projectile movement with NumPy arrays")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times and report the median time")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    assets.set_sound_enabled(False)
+    try:
+        recording = Recording.load(args.replay)
+    except (OSError, ReplayError) as error:
+        print(error)
+        return 2
+
+    times = []
+    for _ in range(args.repeat):
+        final_state, elapsed, failed = replay(recording, args.vectorized)
+        times.append(elapsed)
+    seconds = statistics.median(times)
+    print(f"Replayed {recording.final_tick} ticks and {len(recording.events)} inputs in {seconds:.3f}s "
+          f"({recording.final_tick / max(seconds, 1e-9):.0f} ticks/s)")
+    for event in failed:
+        print(f"Input failed on replay: tick {event[0]}, kind {event[1]}")
+    if tuple(final_state) != tuple(recording.final_state):
+        names = ('gold', 'lives', 'score', 'wave', 'enemies', 'digest')
+        for name, expected, actual in zip(names, recording.final_state, final_state):
+            if expected != actual:
+                print(f"MISMATCH {name}: recorded {expected}, replayed {actual}")
+        return 1
+    print("Final state matches the recording")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+import pygame
+import random
+from constants import *
+from enemy import Enemy
+from tower import Tower
+from coin_pickup import CoinPickup
+from spatial_hash import SpatialHash
+from occupancy import OccupancyGrid
+from pool import pools
+from polyline import Polyline
+from profiler import profiler
+from progress_index import ProgressIndex
+from entity_arrays import EnemyArrays, ProjectileArrays, ArraySpatialHash, ArrayProgressIndex, NUMPY_AVAILABLE
+from assets import assets
+
+class ManualClock:
+    """Tick source that only advances when told to, for running faster than real time"""
+
+    def __init__(self, start=0):
+        self.ticks = start
+
+    def __call__(self):
+        return self.ticks
+
+    def advance(self, milliseconds):
+        """Move the clock forward by the given number of milliseconds"""
+        self.ticks += milliseconds
+        return self.ticks
+
+class Simulation:
+    """Game state and update logic with no dependency on a display, fonts or mixer"""
+
+    def __init__(self, tick_source=None, vectorized=False, seed=None):
+        # Injected tick source (milliseconds); defaults to pygame's wall clock
+        self.tick_source = tick_source or pygame.time.get_ticks
+        
+        # Private RNG stream for the path and wave composition when seeded,
+        # so the same seed always plays out the same game
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random
+
+        # Game state
+        self.gold = STARTING_GOLD
+        self.lives = STARTING_LIVES
+        self.wave = 1
+        self.score = 0
+        self.game_over = False
+        self.wave_in_progress = False
+        self.wave_complete = False
+
+        # Game objects
+        self.enemies = []
+        self.towers = []
+        self.coin_pickups = []
+        self.tower_revision = 0  # Bumped whenever a tower is placed or upgraded
+
+        # Grid settings (needed before path generation)
+        self.grid_size = 40  # Size of each grid cell
+
+        # Spatial index of live enemies for tower targeting, aligned to the grid
+        self.enemy_index = SpatialHash(self.grid_size)
+
+        # Optional array-backed movement for large enemy counts (requires NumPy)
+        self.vectorized = vectorized and NUMPY_AVAILABLE
+
+        # Generate randomized path
+        self.set_path(self.generate_random_path())
+
+        # Wave management
+        self.wave_enemies = []
+        self.enemy_spawn_timer = 0
+        self.enemy_spawn_delay = ENEMY_SPAWN_DELAY
+        self.wave_start_time = 0
+
+    def set_path(self, path):
+        """Use a new path, rebuilding everything laid out along it; call with no towers or enemies"""
+        self.path = path
+
+        # Which cells hold path, towers or UI, for placement checks and tower picking
+        self.occupancy = OccupancyGrid(self.grid_size)
+        self.occupancy.mark_path(self.path)
+
+        # Enemies ordered by progress along the path, for first/last/strongest/weakest targeting
+        self.progress_index = ProgressIndex(self.path)
+
+        self.enemy_arrays = None
+        self.projectile_arrays = None
+        if self.vectorized:
+            self.enemy_arrays = EnemyArrays(self.path)
+            self.projectile_arrays = ProjectileArrays(self.enemy_arrays)
+            self.enemy_index = ArraySpatialHash(self.grid_size, self.enemy_arrays)
+            self.progress_index = ArrayProgressIndex(self.path, self.enemy_arrays)
+
+    def current_time(self):
+        """Current simulation time in milliseconds from the tick source"""
+        return self.tick_source()
+
+    def generate_random_path(self):
+        """Generate a randomized blocky path from left to right with curves, aligned to grid"""
+        path_points = []
+
+        # Starting position (left side) - snap to grid
+        start_x = 60
+        start_y_grid = self.rng.randint(4, 12)  # Random grid row (160px to 480px)
+        start_y = start_y_grid * self.grid_size + self.grid_size // 2
+        path_points.append((start_x, start_y))
+
+        # Generate intermediate points with blocky curves
+        current_x = start_x
+        current_y = start_y
+
+        # Create 8-12 segments for the path
+        num_segments = self.rng.randint(8, 12)
+        segment_width = (SCREEN_WIDTH - 120) // num_segments  # Leave space for castle
+
+        for i in range(1, num_segments):
+            # Move right by segment width (snap to grid)
+            current_x += segment_width
+            current_x = (current_x // self.grid_size) * self.grid_size + self.grid_size // 2
+
+            # Add vertical variation (curves) - snap to grid
+            if i < num_segments // 2:
+                # First half can curve up or down (in grid increments)
+                vertical_change = self.rng.choice([-2, -1, 0, 1, 2]) * self.grid_size
+                current_y += vertical_change
+            else:
+                # Second half should generally move toward center for castle approach
+                target_y_grid = (SCREEN_HEIGHT // 2) // self.grid_size
+                current_y_grid = current_y // self.grid_size
+                if current_y_grid > target_y_grid:
+                    vertical_change = self.rng.choice([-2, -1, 0]) * self.grid_size
+                else:
+                    vertical_change = self.rng.choice([0, 1, 2]) * self.grid_size
+                current_y += vertical_change
+
+            # Snap to grid and keep within reasonable bounds
+            current_y_grid = current_y // self.grid_size
+            current_y_grid = max(3, min(SCREEN_HEIGHT // self.grid_size - 3, current_y_grid))
+            current_y = current_y_grid * self.grid_size + self.grid_size // 2
+
+            current_x_grid = current_x // self.grid_size
+            current_x_grid = max(1, min(SCREEN_WIDTH // self.grid_size - 2, current_x_grid))
+            current_x = current_x_grid * self.grid_size + self.grid_size // 2
+
+            path_points.append((current_x, current_y))
+
+        # Final point (castle position) - snap to grid
+        castle_x_grid = (SCREEN_WIDTH - 80) // self.grid_size
+        castle_x = castle_x_grid * self.grid_size + self.grid_size // 2
+
+        current_y_grid = current_y // self.grid_size
+        castle_y_grid = current_y_grid + self.rng.choice([-1, 0, 1])
+        castle_y_grid = max(4, min(SCREEN_HEIGHT // self.grid_size - 4, castle_y_grid))
+        castle_y = castle_y_grid * self.grid_size + self.grid_size // 2
+
+        path_points.append((castle_x, castle_y))
+
+        return Polyline(path_points)
+
+    def start_wave(self):
+        if not self.wave_in_progress:
+            self.wave_enemies.clear()
+            enemies_in_wave = 5 + self.wave * 2
+
+            # Determine enemy composition based on wave
+            for i in range(enemies_in_wave):
+                if self.wave <= 2:
+                    enemy_type = "goblin"
+                elif self.wave <= 5:
+                    enemy_type = self.rng.choice(["goblin", "orc"])
+                elif self.wave <= 10:
+                    enemy_type = self.rng.choice(["goblin", "orc", "troll"])
+                else:
+                    enemy_type = self.rng.choice(["goblin", "orc", "troll", "dragon"])
+
+                self.wave_enemies.append(enemy_type)
+
+            self.wave_in_progress = True
+            self.wave_complete = False
+            self.enemy_spawn_timer = self.current_time()
+            self.wave_start_time = self.current_time()
+
+    def next_wave(self):
+        """Advance to and start the next wave once the current one is complete"""
+        if not self.wave_complete:
+            return False
+        self.wave += 1
+        self.start_wave()
+        self.wave_complete = False
+        return True
+
+    def spawn_enemy(self):
+        current_time = self.current_time()
+        if (current_time - self.enemy_spawn_timer >= self.enemy_spawn_delay and
+            len(self.wave_enemies) > 0):
+
+            enemy_type = self.wave_enemies.pop(0)
+            self.enemies.append(self.create_enemy(enemy_type))
+            self.enemy_spawn_timer = current_time
+
+    def create_enemy(self, enemy_type):
+        """Create an enemy on the path, array-backed in vectorized mode"""
+        if self.enemy_arrays is not None:
+            return self.enemy_arrays.create(enemy_type)
+        return pools.acquire(Enemy, enemy_type, self.path)
+
+    def update(self):
+        if self.game_over:
+            return
+
+        current_time = self.current_time()
+        mark = profiler.mark
+        profiler.lap()
+
+        # Spawn enemies if wave is in progress
+        if self.wave_in_progress:
+            self.spawn_enemy()
+        mark('update.spawn')
+
+        # Update enemies
+        if self.enemy_arrays is not None:
+            self.update_enemy_arrays()
+        else:
+            survivors = []
+            for enemy in self.enemies:
+                result = enemy.update()
+                if result == "reached_end":
+                    self.enemy_reached_end(enemy)
+                    pools.release(enemy)
+                elif not enemy.alive:
+                    self.enemy_killed(enemy)
+                    pools.release(enemy)
+                else:
+                    survivors.append(enemy)
+            self.enemies[:] = survivors
+        mark('update.enemies')
+
+        # Move all projectiles in one step before towers resolve hits
+        if self.projectile_arrays is not None:
+            self.projectile_arrays.step()
+            mark('update.projectiles')
+
+        # Update towers against a freshly bucketed enemy index
+        self.enemy_index.rebuild(self.enemies)
+        self.progress_index.rebuild(self.enemies)
+        mark('update.targeting')
+        if profiler.enabled:
+            # Split each tower's work between the two phases only while profiling
+            for tower in self.towers:
+                tower.update_shots(self.enemies)
+                mark('update.projectiles')
+                tower.aim(self.enemies, current_time, self.enemy_index, self.progress_index)
+                mark('update.targeting')
+        else:
+            for tower in self.towers:
+                tower.update_shots(self.enemies)
+                tower.aim(self.enemies, current_time, self.enemy_index, self.progress_index)
+
+        # Update coin pickups, returning finished ones to the pool
+        floating = []
+        for coin_pickup in self.coin_pickups:
+            coin_pickup.update()
+            if coin_pickup.alive:
+                floating.append(coin_pickup)
+            else:
+                pools.release(coin_pickup)
+        self.coin_pickups[:] = floating
+        mark('update.coins')
+
+        # Check if wave is complete
+        if (self.wave_in_progress and len(self.wave_enemies) == 0 and
+            len(self.enemies) == 0):
+            self.wave_in_progress = False
+            self.wave_complete = True
+            self.gold += WAVE_COMPLETION_BONUS
+
+    def update_enemy_arrays(self):
+        """Advance all array-backed enemies in one vectorized step"""
+        reached_end, killed = self.enemy_arrays.step()
+        if not reached_end and not killed:
+            return
+        for enemy in reached_end:
+            self.enemy_reached_end(enemy)
+        for enemy in killed:
+            self.enemy_killed(enemy)
+
+        # Drop finished enemies while keeping spawn order, then free their slots
+        removed = set(reached_end)
+        removed.update(killed)
+        self.enemies[:] = [enemy for enemy in self.enemies if enemy not in removed]
+        for enemy in removed:
+            self.enemy_arrays.release(enemy._slot)
+            pools.release(enemy)
+
+    def enemy_reached_end(self, enemy):
+        """Enemy got to the castle: lose a life"""
+        self.lives -= 1
+        if self.lives <= 0:
+            self.game_over = True
+
+    def enemy_killed(self, enemy):
+        """Enemy was defeated: pay out its reward"""
+        # Play enemy death sound effect
+        assets.play_sound('enemy_death')
+
+        # Create coin pickup effect at enemy position
+        coin_pickup = pools.acquire(CoinPickup, enemy.x, enemy.y, enemy.reward)
+        self.coin_pickups.append(coin_pickup)
+
+        self.gold += enemy.reward
+        self.score += enemy.reward
+
+    def release_pooled(self):
+        """Hand every live pooled entity back to its pool before discarding this simulation"""
+        for enemy in self.enemies:
+            pools.release(enemy)
+        for coin_pickup in self.coin_pickups:
+            pools.release(coin_pickup)
+        for tower in self.towers:
+            for projectile in tower.projectiles:
+                pools.release(projectile)
+            for effect in tower.visual_effects:
+                pools.release(effect)
+        self.enemies.clear()
+        self.coin_pickups.clear()
+
+    def snap_to_grid(self, x, y):
+        """Snap a screen position to the center of its grid cell"""
+        grid_x = (x // self.grid_size) * self.grid_size + self.grid_size // 2
+        grid_y = (y // self.grid_size) * self.grid_size + self.grid_size // 2
+        return grid_x, grid_y
+
+    def can_place_tower(self, x, y):
+        """Whether the cell at (x, y) is off the path, out of the UI and not next to a tower"""
+        return self.occupancy.can_place(x, y)
+
+    def place_tower(self, x, y, tower_type):
+        """Place a tower at a grid-snapped position if it is valid and affordable"""
+        if not self.can_place_tower(x, y):
+            return None
+        cost = TOWER_COSTS[tower_type]
+        if self.gold < cost:
+            return None
+        self.gold -= cost
+        return self.add_tower(x, y, tower_type)
+
+    def add_tower(self, x, y, tower_type):
+        """Add a tower without checking placement rules or charging gold"""
+        tower = Tower(x, y, tower_type)
+        tower.projectile_store = self.projectile_arrays
+        self.towers.append(tower)
+        self.occupancy.add_tower(tower)
+        self.tower_revision += 1
+        return tower
+
+    def upgrade_tower(self, tower):
+        """Upgrade a tower if it is below max level and affordable"""
+        if tower.level >= 3:
+            return False
+        cost = tower.cost * tower.level
+        if self.gold < cost:
+            return False
+        self.gold -= cost
+        tower.upgrade()
+        self.tower_revision += 1
+        return True
+
+    def tower_at(self, x, y):
+        """Return the tower whose sprite covers the given position, if any"""
+        return self.occupancy.tower_at(x, y)
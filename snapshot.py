@@ -0,0 +1,252 @@
+import struct
+from collections import deque
+from constants import *
+from simulation import Simulation
+from polyline import Polyline
+from projectile import Projectile
+from explosion import VisualEffect
+from coin_pickup import CoinPickup
+from tower import TARGETING_POLICIES
+from pool import pools
+
+SNAPSHOT_MAGIC = b'KDSS'
+SNAPSHOT_VERSION = 1
+
+# Every record is little-endian and fixed-size; names are ids into a string table
+HEADER = struct.Struct('<4sHd')            # magic, version, simulation time (ms)
+STATE = struct.Struct('<qiiqBdddI')        # gold, lives, wave, score, flags, spawn timer, spawn delay, wave start, tower revision
+RNG = struct.Struct('<B625IBd')            # Mersenne Twister version, state words, has gauss_next, gauss_next
+POINT = struct.Struct('<ii')
+ENEMY = struct.Struct('<HIdddddd?Bd')      # type, path_index, distance, x, y, prev_x, prev_y, health, alive, animation frame, timer
+TOWER = struct.Struct('<ddHBdiiBHH')       # x, y, type, level, last_shot, damage, range, targeting, projectiles, effects
+PROJECTILE = struct.Struct('<ddddiiHdd?')  # x, y, prev_x, prev_y, target enemy index, damage, type, speed, angle, active
+EFFECT = struct.Struct('<ddHHH?')          # x, y, type, current_frame, frame_counter, active
+COIN = struct.Struct('<dddqd?')            # x, y, start_y, value, animation time, alive
+COUNT = struct.Struct('<I')
+
+FLAG_GAME_OVER = 1
+FLAG_WAVE_IN_PROGRESS = 2
+FLAG_WAVE_COMPLETE = 4
+
+class SnapshotError(Exception):
+    pass
+
+def take_snapshot(sim):
+    """Serialize the complete simulation state between ticks"""
+    names = []
+    ids = {}
+
+    def name_id(name):
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+    body = bytearray()
+    flags = ((FLAG_GAME_OVER if sim.game_over else 0) |
+             (FLAG_WAVE_IN_PROGRESS if sim.wave_in_progress else 0) |
+             (FLAG_WAVE_COMPLETE if sim.wave_complete else 0))
+    body += STATE.pack(sim.gold, sim.lives, sim.wave, sim.score, flags, sim.enemy_spawn_timer,
+                       sim.enemy_spawn_delay, sim.wave_start_time, sim.tower_revision)
+
+    version, words, gauss_next = sim.rng.getstate()
+    body += RNG.pack(version, *words, gauss_next is not None, gauss_next or 0.0)
+
+    body += COUNT.pack(len(sim.path))
+    for x, y in sim.path:
+        body += POINT.pack(x, y)
+
+    body += COUNT.pack(len(sim.wave_enemies))
+    body += struct.pack(f'<{len(sim.wave_enemies)}H', *(name_id(name) for name in sim.wave_enemies))
+
+    # Projectiles refer to their target by position in the enemy list
+    enemy_order = {}
+    body += COUNT.pack(len(sim.enemies))
+    for order, enemy in enumerate(sim.enemies):
+        enemy_order[id(enemy)] = order
+        body += ENEMY.pack(name_id(enemy.enemy_type), enemy.path_index, enemy.distance, enemy.x, enemy.y,
+                           enemy.prev_x, enemy.prev_y, enemy.health, enemy.alive,
+                           enemy.animation_frame, enemy.animation_timer)
+
+    body += COUNT.pack(len(sim.towers))
+    for tower in sim.towers:
+        # A projectile whose target was recycled is already lost and would just be dropped
+        projectiles = [(projectile, enemy_order[id(projectile.target)]) for projectile in tower.projectiles
+                       if id(projectile.target) in enemy_order and
+                       projectile.target.pool_generation == projectile.target_generation]
+        body += TOWER.pack(tower.x, tower.y, name_id(tower.tower_type), tower.level, tower.last_shot,
+                           tower.damage, tower.range, TARGETING_POLICIES.index(tower.targeting),
+                           len(projectiles), len(tower.visual_effects))
+        for projectile, target in projectiles:
+            body += PROJECTILE.pack(projectile.x, projectile.y, projectile.prev_x, projectile.prev_y, target,
+                                    projectile.damage, name_id(projectile.tower_type), projectile.speed,
+                                    projectile.angle, projectile.active)
+        for effect in tower.visual_effects:
+            body += EFFECT.pack(effect.x, effect.y, name_id(effect.effect_type), effect.current_frame,
+                                effect.frame_counter, effect.active)
+
+    body += COUNT.pack(len(sim.coin_pickups))
+    for coin in sim.coin_pickups:
+        body += COIN.pack(coin.x, coin.y, coin.start_y, coin.value, coin.animation_time, coin.alive)
+
+    table = bytearray(COUNT.pack(len(names)))
+    for name in names:
+        encoded = name.encode('utf-8')
+        table += struct.pack('<B', len(encoded)) + encoded
+    return HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sim.current_time()) + bytes(table) + bytes(body)
+
+class Reader:
+    """Sequential unpacking of snapshot records"""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, record):
+        values = record.unpack_from(self.data, self.offset)
+        self.offset += record.size
+        return values
+
+    def count(self):
+        return self.read(COUNT)[0]
+
+def restore_snapshot(sim, data):
+    """Replace a simulation's state with a snapshot's, rolling its clock back if it can"""
+    reader = Reader(data)
+    try:
+        magic, version, snapshot_time = reader.read(HEADER)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"not a version {SNAPSHOT_VERSION} snapshot")
+        names = []
+        for _ in range(reader.count()):
+            length = data[reader.offset]
+            names.append(data[reader.offset + 1:reader.offset + 1 + length].decode('utf-8'))
+            reader.offset += 1 + length
+        restore_body(sim, reader, names, snapshot_time)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise SnapshotError("truncated or corrupt snapshot")
+
+def restore_body(sim, reader, names, snapshot_time):
+    # A ManualClock is wound back; any other tick source keeps running, so stored
+    # times are shifted to keep every timer the same distance from now
+    if hasattr(sim.tick_source, 'ticks'):
+        sim.tick_source.ticks = snapshot_time
+        shift = 0
+    else:
+        shift = sim.current_time() - snapshot_time
+
+    (sim.gold, sim.lives, sim.wave, sim.score, flags, spawn_timer, sim.enemy_spawn_delay,
+     wave_start, sim.tower_revision) = reader.read(STATE)
+    sim.game_over = bool(flags & FLAG_GAME_OVER)
+    sim.wave_in_progress = bool(flags & FLAG_WAVE_IN_PROGRESS)
+    sim.wave_complete = bool(flags & FLAG_WAVE_COMPLETE)
+    sim.enemy_spawn_timer = spawn_timer + shift
+    sim.wave_start_time = wave_start + shift
+
+    rng = reader.read(RNG)
+    sim.rng.setstate((rng[0], rng[1:626], rng[627] if rng[626] else None))
+
+    # Entities from before the restore go back to their pools, then the path and
+    # everything laid out along it is rebuilt
+    sim.release_pooled()
+    sim.towers.clear()
+    sim.set_path(Polyline([reader.read(POINT) for _ in range(reader.count())]))
+
+    wave_count = reader.count()
+    sim.wave_enemies[:] = [names[i] for i in reader.read(struct.Struct(f'<{wave_count}H'))]
+
+    for _ in range(reader.count()):
+        (type_id, path_index, distance, x, y, prev_x, prev_y, health, alive,
+         animation_frame, animation_timer) = reader.read(ENEMY)
+        enemy = sim.create_enemy(names[type_id])
+        enemy.path_index = path_index
+        enemy.distance = distance
+        enemy.x, enemy.y = x, y
+        enemy.prev_x, enemy.prev_y = prev_x, prev_y
+        enemy.health = int(health) if health.is_integer() else health
+        enemy.alive = alive
+        enemy.animation_frame = animation_frame
+        enemy.animation_timer = animation_timer
+        sim.enemies.append(enemy)
+
+    revision = sim.tower_revision
+    for _ in range(reader.count()):
+        (x, y, type_id, level, last_shot, damage, tower_range, targeting,
+         projectile_count, effect_count) = reader.read(TOWER)
+        tower = sim.add_tower(x, y, names[type_id])
+        tower.level = level
+        tower.last_shot = last_shot + shift
+        tower.damage = damage
+        tower.range = tower_range
+        tower.targeting = TARGETING_POLICIES[targeting]
+        for _ in range(projectile_count):
+            (px, py, prev_x, prev_y, target, damage, projectile_type, speed,
+             angle, active) = reader.read(PROJECTILE)
+            args = (px, py, sim.enemies[target], damage, tower.projectile_color, speed, names[projectile_type])
+            if tower.projectile_store is not None:
+                projectile = tower.projectile_store.create(*args)
+            else:
+                projectile = pools.acquire(Projectile, *args)
+            projectile.prev_x, projectile.prev_y = prev_x, prev_y
+            projectile.angle = angle
+            projectile.active = active
+            tower.projectiles.append(projectile)
+        for _ in range(effect_count):
+            ex, ey, effect_type, current_frame, frame_counter, active = reader.read(EFFECT)
+            effect = pools.acquire(VisualEffect, ex, ey, names[effect_type])
+            effect.current_frame = current_frame
+            effect.frame_counter = frame_counter
+            effect.active = active
+            tower.visual_effects.append(effect)
+    sim.tower_revision = revision  # add_tower bumped it
+
+    for _ in range(reader.count()):
+        x, y, start_y, value, animation_time, alive = reader.read(COIN)
+        coin = pools.acquire(CoinPickup, x, y, value, False)
+        coin.start_y = start_y
+        coin.animation_time = animation_time
+        coin.alive = alive
+        sim.coin_pickups.append(coin)
+
+def branch(data, tick_source=None, vectorized=False):
+    """A new simulation starting from a snapshot, independent of the one it came from"""
+    sim = Simulation(tick_source, vectorized, seed=0)  # Private RNG stream; its state comes from the snapshot
+    restore_snapshot(sim, data)
+    return sim
+
+class SnapshotRing:
+    """The most recent snapshots in memory, tagged with the tick they were taken on"""
+
+    def __init__(self, capacity=SNAPSHOT_RING_SIZE):
+        self.snapshots = deque(maxlen=capacity)  # (tick, data), oldest first
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def push(self, tick, sim):
+        data = take_snapshot(sim)
+        self.snapshots.append((tick, data))
+        return data
+
+    def latest(self, before=None):
+        """Newest (tick, data) taken before the given tick (or at all), or None"""
+        for entry in reversed(self.snapshots):
+            if before is None or entry[0] < before:
+                return entry
+        return None
+
+    def rollback(self, sim, before=None):
+        """Restore the newest snapshot taken before a tick, discarding any newer ones
+
+        Returns the tick the simulation is back at, or None if there was nothing to restore.
+        """
+        entry = self.latest(before)
+        if entry is None:
+            return None
+        while self.snapshots[-1] is not entry:
+            self.snapshots.pop()
+        restore_snapshot(sim, entry[1])
+        return entry[0]
+
+    def clear(self):
+        self.snapshots.clear()
@@ -0,0 +1,55 @@
+class SpatialHash:
+    """Uniform grid index of live enemies, used for tower range queries"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def cell_of(self, x, y):
+        """Grid cell coordinates containing a position"""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def rebuild(self, enemies):
+        """Re-bucket every live enemy; call once per simulation tick after movement"""
+        cells = {}
+        cell_size = self.cell_size
+        for order, enemy in enumerate(enemies):
+            if not enemy.alive:
+                continue
+            key = (int(enemy.x // cell_size), int(enemy.y // cell_size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [(order, enemy)]
+            else:
+                bucket.append((order, enemy))
+        self.cells = cells
+
+    def query(self, x, y, radius):
+        """Yield (order, enemy) pairs from every cell overlapping the circle's bounding box"""
+        cells = self.cells
+        min_cx, min_cy = self.cell_of(x - radius, y - radius)
+        max_cx, max_cy = self.cell_of(x + radius, y + radius)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def nearest(self, x, y, radius):
+        """Closest live enemy within radius, ties going to the earliest spawned"""
+        radius_sq = radius * radius
+        best = None
+        best_key = None
+        for order, enemy in self.query(x, y, radius):
+            if not enemy.alive:
+                continue
+            dx = enemy.x - x
+            dy = enemy.y - y
+            distance_sq = dx*dx + dy*dy
+            if distance_sq > radius_sq:
+                continue
+            key = (distance_sq, order)
+            if best_key is None or key < best_key:
+                best_key = key
+                best = enemy
+        return best
@@ -2,86 +2,129 @@ import pygame
 import math
 from constants import *
 from projectile import Projectile
+from pool import pools
 from assets import assets
+from entity_types import TOWER_TYPES
+
+# Which in-range enemy a tower shoots at, in the order the UI cycles through them
+TARGETING_POLICIES = ("closest", "first", "last", "strongest", "weakest")
 
 class Tower:
+    __slots__ = ('x', 'y', 'tower_type', 'stats', 'level', 'last_shot', 'damage', 'range',
+                 'targeting', 'projectiles', 'visual_effects', 'projectile_store')
+    
     def __init__(self, x, y, tower_type):
         self.x = x
         self.y = y
         self.tower_type = tower_type
+        self.stats = TOWER_TYPES[tower_type]  # Shared per-type stats
         self.level = 1
         self.last_shot = 0
         
-        if tower_type == "archer":
-            self.damage = 15
-            self.range = 80
-            self.fire_rate = 1000  # milliseconds
-            self.cost = TOWER_COSTS["archer"]
-            self.color = GREEN
-            self.projectile_color = YELLOW
-            self.projectile_speed = 8
-        elif tower_type == "magic":
-            self.damage = 25
-            self.range = 70
-            self.fire_rate = 1500
-            self.cost = TOWER_COSTS["magic"]
-            self.color = BLUE
-            self.projectile_color = PURPLE
-            self.projectile_speed = 10
-        elif tower_type == "cannon":
-            self.damage = 40
-            self.range = 100
-            self.fire_rate = 2000
-            self.cost = TOWER_COSTS["cannon"]
-            self.color = RED
-            self.projectile_color = BLACK
-            self.projectile_speed = 6
+        # Damage and range grow with upgrades
+        self.damage = self.stats.damage
+        self.range = self.stats.range
+        self.targeting = TARGETING_POLICIES[0]
             
         self.projectiles = []
         self.visual_effects = []
         
-    def can_shoot(self, current_time):
-        return current_time - self.last_shot >= self.fire_rate
+        # Array store for projectiles in vectorized mode (set by the simulation)
+        self.projectile_store = None
         
-    def find_target(self, enemies):
-        closest_enemy = None
-        closest_distance = float('inf')
+    @property
+    def fire_rate(self):
+        return self.stats.fire_rate
+    
+    @property
+    def cost(self):
+        return self.stats.cost
+    
+    @property
+    def color(self):
+        return self.stats.color
+    
+    @property
+    def projectile_color(self):
+        return self.stats.projectile_color
+    
+    @property
+    def projectile_speed(self):
+        return self.stats.projectile_speed
         
-        for enemy in enemies:
-            if not enemy.alive:
-                continue
-                
-            distance = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-            if distance <= self.range and distance < closest_distance:
-                closest_distance = distance
-                closest_enemy = enemy
-                
-        return closest_enemy
+    def can_shoot(self, current_time):
+        return current_time - self.last_shot >= self.stats.fire_rate
+        
+    def find_target(self, enemies, enemy_index=None, progress_index=None):
+        # Path-order policies are range queries on the progress index
+        if self.targeting != "closest" and progress_index is not None:
+            return getattr(progress_index, self.targeting)(self)
+            
+        # Use the spatial index when available so only nearby cells are scanned
+        if self.targeting == "closest" and enemy_index is not None:
+            return enemy_index.nearest(self.x, self.y, self.range)
+            
+        in_range = [enemy for enemy in enemies
+                    if enemy.alive and math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2) <= self.range]
+        if not in_range:
+            return None
+        if self.targeting == "first":
+            return max(in_range, key=lambda enemy: enemy.distance)
+        if self.targeting == "last":
+            return min(in_range, key=lambda enemy: enemy.distance)
+        if self.targeting == "strongest":
+            return max(in_range, key=lambda enemy: (enemy.health, enemy.distance))
+        if self.targeting == "weakest":
+            return min(in_range, key=lambda enemy: (enemy.health, -enemy.distance))
+        return min(in_range, key=lambda enemy: (enemy.x - self.x)**2 + (enemy.y - self.y)**2)
+    
+    def cycle_targeting(self):
+        """Switch to the next targeting policy"""
+        index = TARGETING_POLICIES.index(self.targeting)
+        self.targeting = TARGETING_POLICIES[(index + 1) % len(TARGETING_POLICIES)]
         
     def shoot(self, target, current_time):
         if self.can_shoot(current_time):
             # Play tower shooting sound effect
             assets.play_sound('tower_shoot')
             
-            self.projectiles.append(Projectile(self.x, self.y, target, self.damage, self.projectile_color, self.projectile_speed, self.tower_type))
+            if self.projectile_store is not None:
+                projectile = self.projectile_store.create(self.x, self.y, target, self.damage, self.projectile_color, self.projectile_speed, self.tower_type)
+            else:
+                projectile = pools.acquire(Projectile, self.x, self.y, target, self.damage, self.projectile_color, self.projectile_speed, self.tower_type)
+            self.projectiles.append(projectile)
             self.last_shot = current_time
             
-    def update(self, enemies, current_time):
-        # Update projectiles
-        for projectile in self.projectiles[:]:
+    def update(self, enemies, current_time, enemy_index=None, progress_index=None):
+        self.update_shots(enemies)
+        self.aim(enemies, current_time, enemy_index, progress_index)
+        
+    def update_shots(self, enemies):
+        """Move projectiles and advance effects"""
+        # Update projectiles, returning finished ones to the pool
+        in_flight = []
+        for projectile in self.projectiles:
             hit, effect = projectile.update(enemies)
             if hit or not projectile.active:
                 if effect:  # Only add effect if it exists (not None for archer towers)
                     self.visual_effects.append(effect)
-                self.projectiles.remove(projectile)
+                pools.release(projectile)
+            else:
+                in_flight.append(projectile)
+        self.projectiles = in_flight
                 
         # Update visual effects (explosions and sparkles)
-        for effect in self.visual_effects[:]:
-            if not effect.update():
-                self.visual_effects.remove(effect)
-                
-        # Find and shoot at target
-        target = self.find_target(enemies)
+        playing = []
+        for effect in self.visual_effects:
+            if effect.update():
+                playing.append(effect)
+            else:
+                pools.release(effect)
+        self.visual_effects = playing
+        
+    def aim(self, enemies, current_time, enemy_index=None, progress_index=None):
+        """Find and shoot at a target"""
+        target = self.find_target(enemies, enemy_index, progress_index)
         if target:
             self.shoot(target, current_time)
             
@@ -93,38 +136,45 @@ class Tower:
             return self.cost * self.level
         return 0
         
-    def draw(self, screen, selected=False):
+    def queue_draw(self, render_queue, alpha=1.0):
+        """Queue the tower, its projectiles and its effects for drawing"""
+        self.queue_body(render_queue)
+        self.queue_shots(render_queue, alpha)
+        
+    def queue_body(self, render_queue):
+        """Queue the tower itself for drawing"""
+        x, y = int(self.x), int(self.y)
         # Try to get sprite from assets
         sprite = assets.get_tower_sprite(self.tower_type, self.level)
         
         if sprite and sprite.get_width() > 0:  # Valid sprite loaded
             # Draw sprite centered
-            sprite_rect = sprite.get_rect()
-            sprite_rect.center = (int(self.x), int(self.y))
-            screen.blit(sprite, sprite_rect)
-            
-            # Draw level indicator only when selected
-            if selected and self.level > 1:
-                font = pygame.font.Font(None, 28)
-                level_text = font.render(str(self.level), True, WHITE)
-                # Draw background circle for better visibility
-                pygame.draw.circle(screen, BLACK, (int(self.x + 25), int(self.y - 25)), 12)
-                pygame.draw.circle(screen, YELLOW, (int(self.x + 25), int(self.y - 25)), 10)
-                screen.blit(level_text, (self.x + 19, self.y - 33))
+            render_queue.add_centered('towers', sprite, x, y)
         else:
-            # Fallback to colored circle
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 20)
-            pygame.draw.circle(screen, BLACK, (int(self.x), int(self.y)), 20, 2)
+            # Fallback to outlined colored circle
+            render_queue.add_centered('towers', render_queue.circle(self.color, 20, BLACK, 2), x, y)
+            
+            # Level indicator for fallback rendering (always shown for fallback)
+            render_queue.add('towers', render_queue.text(str(self.level), 24, WHITE), (x - 6, y - 8))
+            
+    def draw_level_badge(self, screen):
+        """Draw the level indicator shown while selected, returning the area touched"""
+        sprite = assets.get_tower_sprite(self.tower_type, self.level)
+        if not (sprite and sprite.get_width() > 0) or self.level <= 1:
+            return None  # Fallback rendering already shows the level
             
-            # Draw level indicator for fallback rendering (always shown for fallback)
-            font = pygame.font.Font(None, 24)
-            level_text = font.render(str(self.level), True, WHITE)
-            screen.blit(level_text, (self.x - 6, self.y - 8))
+        font = pygame.font.Font(None, 28)
+        level_text = font.render(str(self.level), True, WHITE)
+        # Draw background circle for better visibility
+        dirty = pygame.draw.circle(screen, BLACK, (int(self.x + 25), int(self.y - 25)), 12)
+        pygame.draw.circle(screen, YELLOW, (int(self.x + 25), int(self.y - 25)), 10)
+        return dirty.union(screen.blit(level_text, (self.x + 19, self.y - 33)))
         
-        # Draw projectiles
+    def queue_shots(self, render_queue, alpha=1.0):
+        """Queue projectiles and effects for drawing"""
         for projectile in self.projectiles:
-            projectile.draw(screen)
+            projectile.queue_draw(render_queue, alpha)
             
-        # Draw visual effects (explosions and sparkles)
+        # Visual effects (explosions and sparkles)
         for effect in self.visual_effects:
-            effect.draw(screen)
+            effect.queue_draw(render_queue)
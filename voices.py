@@ -0,0 +1,110 @@
+import time
+import pygame
+
+# Mixer channels reserved for each group of sounds, so a flood in one group can
+# never cut off another
+CHANNEL_GROUPS = [
+    ('shots', 4),
+    ('deaths', 3),
+    ('pickups', 2),
+    ('effects', 2),  # Anything not listed in SOUND_VOICES
+]
+
+# sound -> (channel group, max concurrent voices, coalesce window in ms)
+SOUND_VOICES = {
+    'tower_shoot': ('shots', 3, 60),
+    'enemy_death': ('deaths', 3, 40),
+    'coin_pickup': ('pickups', 2, 50),
+    'coin_pickup_alt': ('pickups', 2, 50),
+}
+DEFAULT_VOICE = ('effects', 2, 30)
+
+class VoiceManager:
+    """Plays sounds on reserved channel groups with per-sound voice caps
+
+    A trigger is dropped when the same sound started within its coalesce window
+    (the earlier voice stands in for it), when the sound already has its maximum
+    number of voices playing, or when every channel in its group is busy. Windows
+    are in real time: sound is presentation, so fast-forwarding thins it out too.
+    """
+
+    def __init__(self):
+        self.groups = None     # group -> [Channel], assigned once the mixer is up
+        self.last_played = {}  # sound name -> perf_counter seconds
+        self.played = {}
+        self.dropped = {}      # (sound name, reason) -> count
+
+    def setup(self):
+        """Reserve channels for every group; returns False if the mixer is not running"""
+        if self.groups is not None:
+            return True
+        if not pygame.mixer.get_init():
+            return False
+        total = sum(count for _, count in CHANNEL_GROUPS)
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)  # Sound.play() never steals from the groups
+        self.groups = {}
+        index = 0
+        for group, count in CHANNEL_GROUPS:
+            self.groups[group] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            index += count
+        return True
+
+    def play(self, name, sound):
+        """Play a sound under its voice rules; returns whether a voice started"""
+        if not self.setup():
+            return False
+        group, max_voices, coalesce_ms = SOUND_VOICES.get(name, DEFAULT_VOICE)
+
+        now = time.perf_counter()
+        last = self.last_played.get(name)
+        if last is not None and (now - last) * 1000 < coalesce_ms:
+            return self.drop(name, 'coalesced')
+
+        free = None
+        voices = 0
+        for channel in self.groups[group]:
+            if channel.get_busy():
+                if channel.get_sound() is sound:
+                    voices += 1
+            elif free is None:
+                free = channel
+        if voices >= max_voices:
+            return self.drop(name, 'voice_cap')
+        if free is None:
+            return self.drop(name, 'group_full')
+
+        try:
+            free.play(sound)
+        except pygame.error:
+            return self.drop(name, 'error')
+        self.last_played[name] = now
+        self.played[name] = self.played.get(name, 0) + 1
+        return True
+
+    def drop(self, name, reason):
+        key = (name, reason)
+        self.dropped[key] = self.dropped.get(key, 0) + 1
+        return False
+
+    def totals(self):
+        """(voices played, triggers dropped) since the last reset"""
+        return sum(self.played.values()), sum(self.dropped.values())
+
+    def report(self):
+        """Per-sound played and dropped counts, with drops broken down by reason"""
+        names = sorted(set(self.played) | {name for name, _ in self.dropped})
+        lines = []
+        for name in names:
+            reasons = {reason: count for (sound, reason), count in self.dropped.items() if sound == name}
+            dropped = ', '.join(f"{reason} {count}" for reason, count in sorted(reasons.items()))
+            lines.append(f"{name}: played {self.played.get(name, 0)}, dropped {sum(reasons.values())}"
+                         + (f" ({dropped})" if dropped else ""))
+        return lines
+
+    def reset_stats(self):
+        self.played = {}
+        self.dropped = {}
+
+# Global voice manager instance
+voices = VoiceManager()